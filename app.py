@@ -1,16 +1,14 @@
 import streamlit as st
 from datetime import datetime, timedelta
-import time
-from optimized_bbfs_system import get_optimized_system
+from optimized_bbfs_system import DEFAULT_URL, REFRESH_SCHEDULED, get_optimized_system
 
 # Configure for production deployment
-@st.cache_resource
-def load_system():
-    """Load system with caching for better performance"""
+def load_system(data_url=None):
+    """Ambil sistem untuk URL sumber dari registry proses (beberapa market tetap hangat)"""
     try:
         # Allow URL to be customized via environment variable or use default
         import os
-        custom_url = os.getenv('DATA_SOURCE_URL', None)
+        custom_url = data_url or os.getenv('DATA_SOURCE_URL', None)
         return get_optimized_system(custom_url)
     except Exception as e:
         st.error(f"Error loading system: {str(e)}")
@@ -585,8 +583,8 @@ def main():
     </style>
     """, unsafe_allow_html=True)
     
-    # Initialize system
-    system = load_system()
+    # Initialize system: setiap sesi memilih market sendiri, sistemnya dibagi lewat registry
+    system = load_system(st.session_state.get('data_url'))
     
     if system is None:
         st.error("Gagal memuat sistem. Silakan refresh halaman.")
@@ -601,24 +599,40 @@ def main():
     """, unsafe_allow_html=True)
     
     # Auto-load data with better error handling
-    if 'data_loaded' not in st.session_state:
-        st.session_state.data_loaded = False
-    
-    if not st.session_state.data_loaded:
-        try:
-            if system.fetch_complete_data():
-                system.run_performance_test()
-                st.session_state.data_loaded = True
-            else:
-                st.error("Gagal memuat data. Menggunakan mode demo.")
-                st.session_state.data_loaded = True
-        except Exception as e:
-            st.error(f"Error memuat data: {str(e)}")
-            st.session_state.data_loaded = True
+    try:
+        # Load dibagi untuk seluruh proses: sistem yang sudah hangat langsung dipakai,
+        # sesi yang datang bersamaan menunggu satu fetch yang sama
+        if not system.ensure_loaded():
+            st.error("Gagal memuat data. Menggunakan mode demo.")
+    except Exception as e:
+        st.error(f"Error memuat data: {str(e)}")
+    
+    # Satu snapshot immutable untuk seluruh rerun: semua tampilan membaca versi data yang sama
+    # tanpa lock, walaupun refresh di background mempublikasikan snapshot baru
+    snapshot = system.snapshot()
+    
+    # Periode analisis per sesi: pola, backtest dan hasil terbaru dihitung pada view history
+    # di rentang ini (bisect, tanpa copy data); batas yang tidak dipersempit dibiarkan terbuka
+    if snapshot.data:
+        first_day = snapshot.data[0]['date'].date()
+        last_day = snapshot.data[-1]['date'].date()
+        with st.sidebar:
+            st.markdown("### Periode Analisis")
+            period = st.date_input(
+                "Rentang tanggal",
+                value=(first_day, last_day),
+                min_value=first_day,
+                max_value=last_day,
+                key="date_window"
+            )
+        if isinstance(period, (tuple, list)) and len(period) == 2:
+            start = period[0] if period[0] > first_day else None
+            end = period[1] if period[1] < last_day else None
+            snapshot = system.snapshot(start, end)
     
     # Status - selalu tampilkan sesuatu
-    if system.data and len(system.data) > 0:
-        performance = system.get_performance_summary()
+    if snapshot.data and len(snapshot.data) > 0:
+        performance = system.get_performance_summary(snapshot)
         if performance:
             status_color = "#00d2d3" if performance['max_consecutive_loss'] <= 10 else "#ff6b6b"
             status_icon = "●" if performance['max_consecutive_loss'] <= 10 else "●"
@@ -637,28 +651,21 @@ def main():
     
     # Auto Refresh Button
     if st.button("Auto Refresh Data", type="primary", use_container_width=True):
-        with st.spinner("Memperbarui data real-time..."):
-            try:
-                # Clear all caches first
-                system.data = []
-                system.performance_cache = {}
-                system.loss_analysis = {}
-                system.optimization_cache = {}
-                system.last_updated = None
-                
-                # Force reload data
-                if system.fetch_complete_data():
-                    if system.run_performance_test(force_refresh=True):
-                        st.success("Data berhasil diperbarui!")
-                        st.session_state.data_loaded = True
-                        time.sleep(1)
-                        st.rerun()
-                    else:
-                        st.error("Gagal memproses data setelah refresh")
-                else:
-                    st.error("Gagal mengambil data dari server")
-            except Exception as e:
-                st.error(f"Error saat refresh: {str(e)}")
+        try:
+            # Refresh berjalan di scheduler background; data, model dan backtest baru
+            # dipublikasikan utuh sekaligus, jadi halaman tidak menunggu network
+            refreshed = system.request_refresh()
+            if refreshed == REFRESH_SCHEDULED:
+                st.info("Refresh berjalan di background. Data baru tampil pada interaksi berikutnya setelah siap (mis. klik tombol ini lagi)")
+            elif not refreshed:
+                st.error("Gagal mengambil data dari server")
+            elif not system.new_records:
+                st.info("Data sudah terbaru")
+            else:
+                st.success("Data berhasil diperbarui!")
+                st.rerun()
+        except Exception as e:
+            st.error(f"Error saat refresh: {str(e)}")
 
     # URL Configuration Section
     with st.expander("⚙️ Konfigurasi URL Data", expanded=False):
@@ -666,14 +673,14 @@ def main():
         <div class="mobile-card">
             <div style="font-size: 14px; color: rgba(255,255,255,0.8); margin-bottom: 12px;">
                 URL Sumber Data Saat Ini: <br>
-                <span style="color: #e94560; font-family: monospace;">{system.url}</span>
+                <span style="color: #e94560; font-family: monospace;">{snapshot.url}</span>
             </div>
         </div>
         """, unsafe_allow_html=True)
         
         new_url = st.text_input(
             "Ubah URL Sumber Data",
-            value=system.url,
+            value=snapshot.url,
             placeholder="http://example.com/data-source",
             key="main_url_config"
         )
@@ -681,20 +688,15 @@ def main():
         col1, col2 = st.columns([1, 1])
         with col1:
             if st.button("Update URL", type="primary", use_container_width=True):
-                if new_url and new_url.strip() and new_url != system.url:
+                if new_url and new_url.strip() and new_url != snapshot.url:
                     with st.spinner("Mengupdate URL dan memuat data..."):
                         try:
-                            # Update system URL directly
-                            system.url = new_url.strip()
-                            # Clear cache and reload data
-                            system.data = []
-                            system.performance_cache = {}
-                            system.loss_analysis = {}
-                            system.optimization_cache = {}
-                            
-                            if system.fetch_complete_data():
-                                system.run_performance_test(force_refresh=True)
-                                st.success(f"URL berhasil diupdate dan data dimuat! Total: {len(system.data)} records")
+                            # Market yang sudah dimuat langsung dipakai dari registry; sesi lain
+                            # tetap di market masing-masing
+                            new_system = load_system(new_url.strip())
+                            if new_system is not None and new_system.ensure_loaded():
+                                st.session_state.data_url = new_url.strip()
+                                st.success(f"URL berhasil diupdate dan data dimuat! Total: {len(new_system.snapshot().data)} records")
                                 st.rerun()
                             else:
                                 st.error("Gagal memuat data dari URL baru")
@@ -705,17 +707,12 @@ def main():
         
         with col2:
             if st.button("Reset Default", type="secondary", use_container_width=True):
-                default_url = "http://178.128.121.191/"
-                if system.url != default_url:
+                default_url = DEFAULT_URL
+                if snapshot.url != default_url:
                     with st.spinner("Reset ke URL default..."):
-                        system.url = default_url
-                        system.data = []
-                        system.performance_cache = {}
-                        system.loss_analysis = {}
-                        system.optimization_cache = {}
-                        
-                        if system.fetch_complete_data():
-                            system.run_performance_test(force_refresh=True)
+                        default_system = load_system(default_url)
+                        if default_system is not None and default_system.ensure_loaded():
+                            st.session_state.data_url = default_url
                             st.success("URL direset ke default!")
                             st.rerun()
                         else:
@@ -727,27 +724,36 @@ def main():
     
     # Sidebar - Data info
     with st.sidebar:
-        data_info = system.get_data_info()
+        data_info = system.get_data_info(snapshot)
         if data_info:
             st.markdown("### Dataset")
             st.metric("Records", f"{data_info['total_records']:,}")
             st.text(f"{data_info['date_range']['start']} - {data_info['date_range']['end']}")
+            if data_info['window_records'] != data_info['total_records']:
+                st.caption(f"Periode analisis: {data_info['window_records']:,} records")
             
             # Performance metrics
-            performance = system.get_performance_summary()
+            performance = system.get_performance_summary(snapshot)
             if performance:
                 st.markdown("### Performance")
                 st.metric("Max Loss Streak", performance['max_consecutive_loss'])
                 st.metric("Win Rate", f"{performance['win_rate']:.1f}%")
                 target_status = "Tercapai" if performance['max_consecutive_loss'] <= 10 else "Belum Tercapai"
                 st.metric("Target ≤10 Loss", target_status)
+                
+                walk_forward = performance.get('walk_forward')
+                if walk_forward:
+                    st.markdown("### Walk-Forward")
+                    st.caption("Tanpa lookahead: pola hanya dari draw sebelumnya")
+                    st.metric("Max Loss Streak", walk_forward['max_consecutive_loss'])
+                    st.metric("Win Rate", f"{walk_forward['win_rate']:.1f}%")
     
     # Main Content - Mobile Cards
     st.markdown('<div class="section-header">📊 Prediksi BBFS Optimal</div>', unsafe_allow_html=True)
     
     # Selalu tampilkan konten dasar
-    if system.data and len(system.data) >= 2:
-        latest_results = system.get_latest_results(1)
+    if snapshot.data and len(snapshot.data) >= 2:
+        latest_results = system.get_latest_results(1, snapshot)
         if latest_results and len(latest_results) > 0:
             latest = latest_results[0]
             
@@ -765,7 +771,7 @@ def main():
             try:
                 # Generate BBFS untuk latest result
                 input_2d = latest['result'][-2:]
-                bbfs = system.generate_optimized_bbfs(input_2d, current_day_indo)
+                bbfs = system.generate_optimized_bbfs(input_2d, current_day_indo, snapshot=snapshot)
                 
                 st.markdown(f"""
                 <div class="mobile-card">
@@ -787,7 +793,7 @@ def main():
                 """, unsafe_allow_html=True)
                 
                 # Quick metrics dengan validasi data
-                performance = system.get_performance_summary()
+                performance = system.get_performance_summary(snapshot)
                 if performance and performance.get('total_tests', 0) > 0:
                     # Validasi ulang perhitungan untuk memastikan akurasi
                     total_tests = performance.get('total_tests', 0)
@@ -842,7 +848,7 @@ def main():
     st.markdown('<div class="section-title">Loss Streak Aktif</div>', unsafe_allow_html=True)
     
     # Calculate current loss streak
-    current_loss_streak, streak_details = system.get_current_loss_streak_analysis(10)
+    current_loss_streak, streak_details = system.get_current_loss_streak_analysis(10, snapshot)
     
     # Display current streak
     col1, col2 = st.columns([1, 1])
@@ -920,7 +926,7 @@ def main():
     
     # Loss Streak Statistics
     st.markdown('<div class="section-title">Statistik Loss Streak</div>', unsafe_allow_html=True)
-    loss_stats = system.get_consecutive_loss_breakdown()
+    loss_stats = system.get_consecutive_loss_breakdown(snapshot)
     if loss_stats and len(loss_stats) > 0:
         st.markdown('<div class="analytics-card">', unsafe_allow_html=True)
         
@@ -982,26 +988,23 @@ def main():
     
     # Refresh button
     if st.button("Refresh Data Terbaru", key="refresh_realtime", use_container_width=True, type="primary"):
-        with st.spinner("Mengambil data real-time..."):
-            try:
-                # Clear cache for fresh data
-                system.data = []
-                system.performance_cache = {}
-                system.loss_analysis = {}
-                system.optimization_cache = {}
-                
-                if system.fetch_complete_data():
-                    system.run_performance_test(force_refresh=True)
-                    st.success("Data terbaru berhasil dimuat!")
-                    time.sleep(0.8)
-                    st.rerun()
-                else:
-                    st.error("Gagal mengambil data terbaru")
-            except Exception as e:
-                st.error(f"Error saat refresh: {str(e)}")
+        try:
+            # Refresh berjalan di scheduler background, tanpa menunggu network
+            refreshed = system.request_refresh()
+            if refreshed == REFRESH_SCHEDULED:
+                st.info("Refresh berjalan di background. Data baru tampil pada interaksi berikutnya setelah siap (mis. klik tombol ini lagi)")
+            elif not refreshed:
+                st.error("Gagal mengambil data terbaru")
+            elif not system.new_records:
+                st.info("Data sudah terbaru")
+            else:
+                st.success("Data terbaru berhasil dimuat!")
+                st.rerun()
+        except Exception as e:
+            st.error(f"Error saat refresh: {str(e)}")
     
     # Get real-time analysis data
-    realtime_analysis = system.get_real_time_analysis(8)
+    realtime_analysis = system.get_real_time_analysis(8, snapshot)
     if realtime_analysis:
         # Current result info dari data terbaru
         latest = realtime_analysis[0]
@@ -0,0 +1,264 @@
+import copy
+from collections import Counter
+
+import numpy as np
+
+from bbfs_model import DEFAULT_PARAMS, LOSS_THRESHOLD, PatternModel, context_bucket
+
+DIGIT_BITS = (1 << np.arange(10)).astype(np.uint16)
+
+
+def digit_mask(two_digit):
+    """Bitmask 10-bit dari array nilai 2D (0-99)"""
+    two_digit = np.asarray(two_digit)
+    return DIGIT_BITS[two_digit // 10] | DIGIT_BITS[two_digit % 10]
+
+
+def mask_to_string(mask):
+    """Bitmask BBFS menjadi string digit terurut, mis. 0b1000010011 -> '0149'"""
+    return ''.join(str(d) for d in range(10) if mask >> d & 1)
+
+
+class BacktestResult:
+    """Kolom per-langkah hasil backtest (langkah i: prediksi dari draw i untuk draw i + 1)"""
+
+    def __init__(self, win, streak, bucket, bbfs_mask):
+        self.win = win
+        self.streak = streak
+        self.bucket = bucket
+        self.bbfs_mask = bbfs_mask
+
+    @property
+    def total_tests(self):
+        return len(self.win)
+
+    @property
+    def nbytes(self):
+        return self.win.nbytes + self.streak.nbytes + self.bucket.nbytes + self.bbfs_mask.nbytes
+
+    @property
+    def total_wins(self):
+        return int(self.win.sum())
+
+    @property
+    def max_consecutive_loss(self):
+        return int(self.streak.max()) if len(self.streak) else 0
+
+    @property
+    def loss_streaks(self):
+        """Panjang setiap loss streak secara kronologis (run-length encoding)"""
+        if not len(self.win):
+            return []
+        run_ends = (self.streak > 0) & np.append(self.win[1:], True)
+        return self.streak[run_ends].tolist()
+
+
+def running_streak(win):
+    """Jumlah loss beruntun setelah setiap langkah"""
+    steps = np.arange(len(win))
+    last_win = np.maximum.accumulate(np.where(win, steps, -1))
+    return (steps - last_win).astype(np.int32)
+
+
+def run_bitmask_backtest(masks, day_codes, inputs, targets, loss_threshold=LOSS_THRESHOLD):
+    """Backtest vectorized: BBFS dan 2D aktual sebagai bitmask, win = (target & bbfs) == target
+
+    masks: tabel BBFS [hari, input_2d, bucket] (uint16) yang dibangun dengan loss_threshold. Langkah setelah win selalu memakai
+    bucket 0 sehingga langsung vectorized; langkah di dalam loss streak (bucket bergantung pada
+    streak berjalan) dihitung per gelombang, dan hanya rantai awal streak yang diikuti sekuensial.
+    """
+    n = len(inputs)
+    # Kolom per bucket; posisi n adalah sentinel yang selalu "menang" agar streak yang
+    # belum selesai di akhir data berhenti di sana tanpa pengecekan batas
+    bucket_masks = np.ascontiguousarray(masks.reshape(-1, masks.shape[-1]).T)
+    keys = np.append(day_codes.astype(np.intp) * masks.shape[1] + inputs, 0)
+    target_mask = np.append(digit_mask(targets), np.uint16(0))
+
+    # Setiap loss pada bucket 0 adalah calon awal loss streak. Panjang streak dari setiap calon
+    # (dengan asumsi streak dimulai dari sana) dihitung bergelombang: gelombang k memeriksa
+    # langkah start + k dengan bucket(k) untuk semua calon yang belum menang sekaligus.
+    is_start = (bucket_masks[0][keys[:n]] & target_mask[:n]) != target_mask[:n]
+    starts = np.flatnonzero(is_start)
+    loss = np.zeros(n + 1, dtype=np.int32)
+    if len(starts):
+        run_length = np.empty(len(starts), dtype=np.intp)
+        pending = np.arange(len(starts))
+        positions = starts + 1
+        k = 1
+        while len(pending):
+            target = target_mask[positions]
+            won = (bucket_masks[context_bucket(k, loss_threshold)][keys[positions]] & target) == target
+            run_length[pending[won]] = k
+            lost = ~won
+            pending = pending[lost]
+            positions = positions[lost] + 1
+            k += 1
+
+        # Hanya streak yang benar-benar terjadi yang diikuti secara sekuensial: setelah streak
+        # berakhir dengan win, streak berikutnya dimulai di calon pertama sesudahnya
+        run_end = starts + run_length
+        # Indeks calon pertama setelah posisi win = jumlah calon sebelum posisi tersebut
+        starts_before = np.concatenate(([0], np.cumsum(is_start), [len(starts)]))
+        next_start = starts_before[run_end + 1].tolist()
+        actual = []
+        record = actual.append
+        candidates = len(next_start)
+        j = 0
+        while j < candidates:
+            record(j)
+            j = next_start[j]
+        loss[starts[actual]] += 1
+        loss[run_end[actual]] -= 1
+    win = np.cumsum(loss[:n]) == 0
+
+    streak = running_streak(win)
+    previous = np.concatenate(([0], streak[:-1])) if n else streak
+    bucket = np.where(
+        previous <= loss_threshold, previous, loss_threshold + 1 + previous % 10
+    ).astype(np.uint8)
+    bbfs_mask = bucket_masks[bucket, keys[:n]]
+    return BacktestResult(win, streak, bucket, bbfs_mask)
+
+
+def backtest_history(model, history):
+    """Backtest in-sample seluruh history memakai tabel BBFS model"""
+    if len(history) < 2:
+        return BacktestResult(
+            np.zeros(0, dtype=bool), np.zeros(0, dtype=np.int32),
+            np.zeros(0, dtype=np.uint8), np.zeros(0, dtype=np.uint16)
+        )
+    return run_bitmask_backtest(
+        model.masks, history.day_codes[:-1], history.last_2d[:-1], history.last_2d[1:],
+        model.params.loss_threshold
+    )
+
+
+class BacktestCheckpoint:
+    """State backtest yang bisa dilanjutkan: counter, streak berjalan, daftar streak dan hitungannya
+
+    Elemen terakhir loss_streaks adalah streak yang masih berjalan bila langkah terakhir loss.
+    """
+
+    def __init__(self):
+        self.total_tests = 0
+        self.total_wins = 0
+        self.consecutive_losses = 0
+        self.max_consecutive_loss = 0
+        self.loss_streaks = []
+        self.streak_counts = Counter()
+
+    @classmethod
+    def from_result(cls, result):
+        """Checkpoint dari kolom BacktestResult (dihitung vectorized)"""
+        checkpoint = cls()
+        checkpoint.total_tests = result.total_tests
+        checkpoint.total_wins = result.total_wins
+        checkpoint.consecutive_losses = int(result.streak[-1]) if result.total_tests else 0
+        checkpoint.max_consecutive_loss = result.max_consecutive_loss
+        checkpoint.loss_streaks = result.loss_streaks
+        checkpoint.streak_counts = Counter(checkpoint.loss_streaks)
+        return checkpoint
+
+    def copy(self):
+        checkpoint = copy.copy(self)
+        checkpoint.loss_streaks = list(self.loss_streaks)
+        checkpoint.streak_counts = Counter(self.streak_counts)
+        return checkpoint
+
+    def record(self, is_win):
+        """Tambahkan hasil satu langkah, O(1)"""
+        self.total_tests += 1
+        if is_win:
+            self.total_wins += 1
+            self.consecutive_losses = 0
+            return
+        if self.consecutive_losses:
+            # Streak berjalan diperpanjang
+            self.streak_counts[self.consecutive_losses] -= 1
+            if not self.streak_counts[self.consecutive_losses]:
+                del self.streak_counts[self.consecutive_losses]
+            self.loss_streaks[-1] += 1
+        else:
+            self.loss_streaks.append(1)
+        self.consecutive_losses += 1
+        self.streak_counts[self.consecutive_losses] += 1
+        self.max_consecutive_loss = max(self.max_consecutive_loss, self.consecutive_losses)
+
+    def summary(self):
+        """Metrik ringkas dengan format yang sama seperti performance_data"""
+        total_tests = self.total_tests
+        total_wins = self.total_wins
+        win_rate = (total_wins / total_tests * 100) if total_tests > 0 else 0
+        return {
+            'total_tests': total_tests,
+            'total_wins': total_wins,
+            'total_losses': total_tests - total_wins,
+            'win_rate': round(win_rate, 1),
+            'loss_rate': round(100 - win_rate, 1),
+            'max_consecutive_loss': self.max_consecutive_loss,
+            'loss_streaks': list(self.loss_streaks),
+            'meets_target': self.max_consecutive_loss <= 10
+        }
+
+
+class WalkForwardBacktest:
+    """Backtest tanpa lookahead yang bisa dilanjutkan saat draw baru masuk
+
+    BBFS langkah i hanya memakai transisi sebelum draw i; hitungan pola diperbarui satu transisi
+    per langkah (PatternModel.add_transition). Karena prefix tidak pernah berubah, draw baru cukup
+    melanjutkan checkpoint: O(1) per draw, tanpa replay history.
+    """
+
+    def __init__(self, params=DEFAULT_PARAMS):
+        self.model = PatternModel(params)
+        self.checkpoint = BacktestCheckpoint()
+
+    def copy(self):
+        """Salinan independen untuk dilanjutkan tanpa mengubah versi yang sudah dipublikasikan"""
+        walk_forward = WalkForwardBacktest.__new__(WalkForwardBacktest)
+        walk_forward.model = self.model.copy()
+        walk_forward.checkpoint = self.checkpoint.copy()
+        return walk_forward
+
+    def extend(self, history):
+        """Lanjutkan backtest sampai draw terakhir history, mengembalikan jumlah langkah baru"""
+        start = self.checkpoint.total_tests
+        day_codes = history.day_codes[start:].tolist()
+        last_2d = history.last_2d[start:].tolist()
+        bits = DIGIT_BITS.tolist()
+        model = self.model
+        checkpoint = self.checkpoint
+        for i in range(len(last_2d) - 1):
+            inp = last_2d[i]
+            next_2d = last_2d[i + 1]
+            mask = 0
+            for digit in model.generate_digits(inp, day_codes[i], checkpoint.consecutive_losses):
+                mask |= bits[digit]
+            target = bits[next_2d // 10] | bits[next_2d % 10]
+            checkpoint.record(mask & target == target)
+            model.add_transition(day_codes[i], inp, next_2d)
+        return max(len(last_2d) - 1, 0)
+
+    @property
+    def nbytes(self):
+        return self.model.nbytes
+
+    def summary(self):
+        return self.checkpoint.summary()
+
+
+def sequential_backtest(model, history):
+    """Referensi: loop per-langkah seperti implementasi lama (dipakai untuk verifikasi/benchmark)"""
+    table = model.table
+    loss_threshold = model.params.loss_threshold
+    win = np.zeros(max(len(history) - 1, 0), dtype=bool)
+    consecutive_losses = 0
+    day_codes = history.day_codes.tolist()
+    last_2d = history.last_2d.tolist()
+    for i in range(len(history) - 1):
+        bbfs = set(table[day_codes[i], last_2d[i], context_bucket(consecutive_losses, loss_threshold)].tolist())
+        next_2d = last_2d[i + 1]
+        is_win = {next_2d // 10, next_2d % 10}.issubset(bbfs)
+        win[i] = is_win
+        consecutive_losses = 0 if is_win else consecutive_losses + 1
+    return win
@@ -0,0 +1,315 @@
+import copy
+from collections import namedtuple
+
+import numpy as np
+
+from draw_history import DAY_CODES
+
+# Baris tambahan untuk hari yang tidak dikenal (selalu kosong)
+NO_DAY = 7
+DAY_ROWS = 8
+# Urutan kemunculan pertama untuk digit yang belum pernah muncul
+UNSEEN = np.iinfo(np.int64).max
+
+# loss_context di atas threshold mengaktifkan Strategy 5; di atasnya hanya loss % 10 yang
+# masih berpengaruh (geseran digit), sehingga semua konteks runtuh ke 4 + 10 bucket
+LOSS_THRESHOLD = 3
+CONTEXT_BUCKETS = LOSS_THRESHOLD + 1 + 10
+DIGITS = np.arange(10)
+
+
+class BBFSParams(namedtuple('BBFSParams', (
+        'day_top', 'input_top', 'global_top', 'input_score', 'presence_weight', 'shift_score',
+        'loss_threshold'), defaults=(6, 4, 5, 1000, 20, 50, LOSS_THRESHOLD))):
+    """Knob generate BBFS; default sama persis dengan strategi asli
+
+    - day_top / input_top / global_top: jumlah digit teratas dari pola hari, pola input dan global
+    - input_score, presence_weight, shift_score: bobot skor digit input, kehadiran per hari
+      dan digit geser loss (skor = frekuensi global + presence * presence_weight + ...)
+    - loss_threshold: loss beruntun di atas nilai ini mengaktifkan Strategy 5 (anti-loss)
+    Skor harus bilangan bulat agar tie-breaker digit (skor + digit * 0.1) tetap berlaku.
+    """
+    __slots__ = ()
+
+    @property
+    def context_buckets(self):
+        return self.loss_threshold + 1 + 10
+
+
+DEFAULT_PARAMS = BBFSParams()
+
+
+def context_bucket(loss_context, loss_threshold=LOSS_THRESHOLD):
+    """Bucket tabel untuk nilai loss_context"""
+    if loss_context <= loss_threshold:
+        return max(loss_context, 0)
+    return loss_threshold + 1 + loss_context % 10
+
+
+def bucket_losses(loss_threshold=LOSS_THRESHOLD):
+    """Nilai loss_context representatif untuk setiap bucket"""
+    losses = list(range(loss_threshold + 1))
+    for remainder in range(10):
+        loss = remainder
+        while loss <= loss_threshold:
+            loss += 10
+        losses.append(loss)
+    return np.array(losses)
+
+
+def _top_mask(counts, first, k):
+    """Mask vectorized k digit teratas per baris (urutan sama dengan _top_digits)"""
+    order = np.lexsort((first, -counts), axis=-1)
+    ranks = np.empty_like(order)
+    np.put_along_axis(ranks, order, np.broadcast_to(DIGITS, order.shape), axis=-1)
+    return (ranks < k) & (counts > 0)
+
+
+def _table_masks(table):
+    """Tabel BBFS [..., 5] menjadi bitmask 10-bit (uint16)"""
+    return np.bitwise_or.reduce(np.left_shift(1, table.astype(np.uint16)), axis=-1).astype(np.uint16)
+
+
+def _top_digits(counts, first, k):
+    """Digit dengan count > 0 diurutkan seperti Counter.most_common (count desc, kemunculan pertama asc)"""
+    ranked = sorted((-c, f, d) for d, (c, f) in enumerate(zip(counts, first)) if c > 0)
+    return [d for _, _, d in ranked[:k]]
+
+
+class PatternModel:
+    """Tabel hitungan digit next-2D berukuran tetap untuk generate BBFS O(1)
+
+    - day_counts[day, input_2d, digit]: jumlah kemunculan digit pada next-2D
+    - day_presence[day, input_2d, digit]: jumlah next-2D yang mengandung digit
+    - input_counts[input_2d, digit] dan global_counts[digit]: sama, tanpa/di semua konteks
+    - *_first: urutan kemunculan pertama (tie-breaker most_common)
+
+    Tabel BBFS materialisasi memakai params (BBFSParams); hitungan tidak bergantung pada params,
+    jadi satu model bisa menghasilkan tabel untuk banyak params (masks_for).
+    """
+
+    def __init__(self, params=DEFAULT_PARAMS):
+        self.params = params
+        self.day_counts = np.zeros((DAY_ROWS, 100, 10), dtype=np.int64)
+        self.day_presence = np.zeros((DAY_ROWS, 100, 10), dtype=np.int64)
+        self.day_first = np.full((DAY_ROWS, 100, 10), UNSEEN, dtype=np.int64)
+        self.input_counts = np.zeros((100, 10), dtype=np.int64)
+        self.input_first = np.full((100, 10), UNSEEN, dtype=np.int64)
+        self.global_counts = np.zeros(10, dtype=np.int64)
+        self.global_first = np.full(10, UNSEEN, dtype=np.int64)
+        self.transitions = 0
+        self._global_rank = None
+        self._table = None
+        self._masks = None
+
+    @classmethod
+    def from_history(cls, history, params=DEFAULT_PARAMS):
+        """Bangun semua tabel dari DrawHistory dalam satu pass vectorized"""
+        model = cls(params)
+        n = len(history) - 1
+        if n <= 0:
+            return model
+
+        days = history.day_codes[:-1].astype(np.int64)
+        inputs = history.last_2d[:-1].astype(np.int64)
+        nexts = history.last_2d[1:].astype(np.int64)
+        tens = nexts // 10
+        ones = nexts % 10
+        seq = np.arange(n, dtype=np.int64) * 2
+        repeated = tens == ones
+
+        day_key = (days * 100 + inputs) * 10
+        input_key = inputs * 10
+        size = DAY_ROWS * 100 * 10
+        for digits, order in ((tens, seq), (ones, seq + 1)):
+            model.day_counts += np.bincount(day_key + digits, minlength=size).reshape(DAY_ROWS, 100, 10)
+            model.input_counts += np.bincount(input_key + digits, minlength=1000).reshape(100, 10)
+            model.global_counts += np.bincount(digits, minlength=10)
+            np.minimum.at(model.day_first.reshape(-1), day_key + digits, order)
+            np.minimum.at(model.input_first.reshape(-1), input_key + digits, order)
+            np.minimum.at(model.global_first, digits, order)
+
+        # Presence: digit kembar (mis. "11") hanya dihitung sekali per next-2D
+        model.day_presence += np.bincount(day_key + tens, minlength=size).reshape(DAY_ROWS, 100, 10)
+        model.day_presence += np.bincount(
+            day_key[~repeated] + ones[~repeated], minlength=size
+        ).reshape(DAY_ROWS, 100, 10)
+
+        model.transitions = n
+        return model
+
+    def add_transition(self, day_code, input_2d, next_2d):
+        """Tambahkan satu transisi (input_2d -> next_2d) secara inkremental"""
+        tens, ones = next_2d // 10, next_2d % 10
+        seq = self.transitions * 2
+        for digit, order in ((tens, seq), (ones, seq + 1)):
+            self.day_counts[day_code, input_2d, digit] += 1
+            self.input_counts[input_2d, digit] += 1
+            self.global_counts[digit] += 1
+            if self.day_first[day_code, input_2d, digit] == UNSEEN:
+                self.day_first[day_code, input_2d, digit] = order
+            if self.input_first[input_2d, digit] == UNSEEN:
+                self.input_first[input_2d, digit] = order
+            if self.global_first[digit] == UNSEEN:
+                self.global_first[digit] = order
+        self.day_presence[day_code, input_2d, tens] += 1
+        if ones != tens:
+            self.day_presence[day_code, input_2d, ones] += 1
+        self.transitions += 1
+        self._global_rank = None
+        self._table = None
+        self._masks = None
+
+    def copy(self):
+        """Salinan untuk update copy-on-write; tabel materialisasi dipakai bersama karena tidak pernah dimutasi"""
+        model = copy.copy(self)
+        for name in ('day_counts', 'day_presence', 'day_first', 'input_counts', 'input_first',
+                     'global_counts', 'global_first'):
+            setattr(model, name, getattr(self, name).copy())
+        return model
+
+    @property
+    def nbytes(self):
+        arrays = [self.day_counts, self.day_presence, self.day_first, self.input_counts,
+                  self.input_first, self.global_counts, self.global_first]
+        arrays += [array for array in (self._table, self._masks) if array is not None]
+        return sum(array.nbytes for array in arrays)
+
+    @property
+    def global_rank(self):
+        """Vektor digit global terurut berdasarkan frekuensi (seperti global_freq.most_common)"""
+        if self._global_rank is None:
+            self._global_rank = _top_digits(self.global_counts.tolist(), self.global_first.tolist(), 10)
+        return self._global_rank
+
+    def generate(self, input_2d, day, loss_context=0):
+        """Generate BBFS dari lookup tabel berukuran tetap, hasil identik dengan versi Counter"""
+        inp = int(input_2d[0]) * 10 + int(input_2d[1])
+        return [str(digit) for digit in self.generate_digits(inp, DAY_CODES.get(day, NO_DAY), loss_context)]
+
+    def generate_digits(self, inp, day_code, loss_context=0):
+        """Scoring BBFS untuk input_2d (0-99) dan kode hari, hasil berupa list digit int"""
+        params = self.params
+        a, b = divmod(inp, 10)
+
+        # Strategy 1: Always include input digits (highest priority)
+        candidates = {a, b}
+
+        # Strategy 2: Day-specific patterns
+        day_counts = self.day_counts[day_code, inp].tolist()
+        candidates.update(_top_digits(day_counts, self.day_first[day_code, inp].tolist(), params.day_top))
+
+        # Strategy 3: Input-specific patterns (regardless of day)
+        candidates.update(_top_digits(self.input_counts[inp].tolist(), self.input_first[inp].tolist(),
+                                      params.input_top))
+
+        # Strategy 4: Global high frequency digits
+        candidates.update(self.global_rank[:params.global_top])
+
+        # Strategy 5: Anti-loss enhancement (untuk loss context > loss_threshold)
+        if loss_context > params.loss_threshold:
+            for digit in (a, b):
+                candidates.add((digit + 5) % 10)
+                candidates.add((digit + 1) % 10)
+                candidates.add((digit + 2) % 10)
+
+        if len(candidates) > 5:
+            global_counts = self.global_counts.tolist()
+            presence = self.day_presence[day_code, inp].tolist()
+            shifted = {(a + loss_context) % 10, (b + loss_context) % 10} if loss_context > 0 else ()
+            digit_scores = []
+            for digit in candidates:
+                score = global_counts[digit] + presence[digit] * params.presence_weight
+                if digit == a or digit == b:
+                    score += params.input_score
+                if digit in shifted:
+                    score += params.shift_score
+                # Tie-breaker berdasarkan nilai digit (deterministik)
+                digit_scores.append((score + digit * 0.1, digit))
+            digit_scores.sort(reverse=True)
+            bbfs = [digit for _, digit in digit_scores[:5]]
+        else:
+            bbfs = sorted(candidates)
+
+        # Ensure exactly 5 digits
+        for digit in range(10):
+            if len(bbfs) >= 5:
+                break
+            if digit not in bbfs:
+                bbfs.append(digit)
+
+        return bbfs
+
+    def build_table(self):
+        """Materialisasi BBFS untuk semua (hari, input_2d, bucket loss_context) sekaligus"""
+        table = self.table_for(self.params)
+        self._table = table
+        self._masks = _table_masks(table)
+        return table
+
+    def masks_for(self, params):
+        """Tabel bitmask [hari, input_2d, bucket] untuk params lain, tanpa mengubah model"""
+        if params == self.params:
+            return self.masks
+        return _table_masks(self.table_for(params))
+
+    def table_for(self, params):
+        """Tabel BBFS [hari, input_2d, bucket, 5] untuk params (vectorized, tidak di-cache)"""
+        inputs = np.arange(100)
+        first_digit = (inputs // 10)[:, None]
+        second_digit = (inputs % 10)[:, None]
+        is_input = (DIGITS == first_digit) | (DIGITS == second_digit)
+
+        global_top = np.zeros(10, dtype=bool)
+        global_top[self.global_rank[:params.global_top]] = True
+        base = (
+            is_input[None] |
+            _top_mask(self.day_counts, self.day_first, params.day_top) |
+            _top_mask(self.input_counts, self.input_first, params.input_top)[None] |
+            global_top
+        )
+
+        losses = bucket_losses(params.loss_threshold)
+        anti_loss = np.zeros((100, 10), dtype=bool)
+        for offset in (5, 1, 2):
+            anti_loss |= DIGITS == (first_digit + offset) % 10
+            anti_loss |= DIGITS == (second_digit + offset) % 10
+        candidates = base[:, :, None, :] | (
+            (losses > params.loss_threshold)[None, None, :, None] & anti_loss[None, :, None, :]
+        )
+
+        # Skor integer: (skor lama) * 10 + digit, urutannya sama dengan skor + digit * 0.1
+        shifted = (
+            (DIGITS == (first_digit[:, :, None] + losses[:, None]) % 10) |
+            (DIGITS == (second_digit[:, :, None] + losses[:, None]) % 10)
+        ) & (losses > 0)[:, None]
+        score = params.input_score * is_input[None] + self.global_counts + params.presence_weight * self.day_presence
+        score = (score[:, :, None, :] + params.shift_score * shifted[None]) * 10 + DIGITS
+
+        ranked = np.argsort(-np.where(candidates, score, -1), axis=-1, kind='stable')[..., :5]
+        padded = np.argsort(np.where(candidates, DIGITS, DIGITS + 10), axis=-1, kind='stable')[..., :5]
+        many = candidates.sum(axis=-1) > 5
+        return np.where(many[..., None], ranked, padded).astype(np.uint8)
+
+    def ensure_table(self):
+        """Bangun tabel materialisasi bila belum ada (model baru atau setelah add_transition)"""
+        if self._table is None:
+            self.build_table()
+        return self._table
+
+    @property
+    def table(self):
+        """Tabel BBFS [hari, input_2d, bucket, 5] (uint8), dibangun sekali per versi data"""
+        return self.ensure_table()
+
+    @property
+    def masks(self):
+        """BBFS sebagai bitmask 10-bit [hari, input_2d, bucket] (uint16)"""
+        self.ensure_table()
+        return self._masks
+
+    def lookup(self, input_2d, day, loss_context=0):
+        """BBFS dari tabel materialisasi, tanpa scoring"""
+        row = self.table[DAY_CODES.get(day, NO_DAY), int(input_2d),
+                         context_bucket(loss_context, self.params.loss_threshold)]
+        return [str(digit) for digit in row.tolist()]
@@ -0,0 +1,73 @@
+#!/usr/bin/env python3
+"""
+Benchmark backtest: loop per-langkah lama (generate BBFS + set.issubset per draw)
+dibandingkan kernel bitmask vectorized pada history sintetis.
+
+Jalankan dari root repo:  python -m benchmarks.bench_backtest [--draws 1000000]
+"""
+
+import argparse
+import time
+
+from bbfs_backtest import backtest_history
+from bbfs_model import PatternModel
+from benchmarks.synthetic import synthetic_history
+
+
+def legacy_backtest(model, history):
+    """Salinan inti loop lama OptimizedBBFSSystem.test_comprehensive_performance"""
+    consecutive_losses = 0
+    max_consecutive = 0
+    total_wins = 0
+    total_tests = 0
+    loss_streaks = []
+    for i in range(len(history) - 1):
+        current = history[i]
+        next_item = history[i + 1]
+        bbfs = model.lookup(current['last_2d'], current['day'], consecutive_losses)
+        is_win = set(next_item['last_2d']).issubset(set(bbfs))
+        total_tests += 1
+        if is_win:
+            total_wins += 1
+            if consecutive_losses > 0:
+                loss_streaks.append(consecutive_losses)
+                consecutive_losses = 0
+        else:
+            consecutive_losses += 1
+            max_consecutive = max(max_consecutive, consecutive_losses)
+    if consecutive_losses > 0:
+        loss_streaks.append(consecutive_losses)
+    return total_tests, total_wins, max_consecutive, loss_streaks
+
+
+def timed(func):
+    start = time.perf_counter()
+    result = func()
+    return result, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--draws', type=int, default=1_000_000)
+    args = parser.parse_args()
+
+    history = synthetic_history(args.draws)
+    model = PatternModel.from_history(history)
+    model.build_table()
+    print(f"History sintetis: {len(history):,} draw")
+
+    legacy, legacy_time = timed(lambda: legacy_backtest(model, history))
+    backtest, kernel_time = timed(lambda: backtest_history(model, history))
+    vectorized = (backtest.total_tests, backtest.total_wins, backtest.max_consecutive_loss, backtest.loss_streaks)
+    if vectorized != legacy:
+        raise SystemExit("Hasil backtest berbeda antara loop lama dan kernel vectorized")
+
+    print(f"{'Backtest':<12}{'Waktu (s)':>12}{'Draw/s':>16}")
+    for name, elapsed in (('legacy', legacy_time), ('vectorized', kernel_time)):
+        print(f"{name:<12}{elapsed:>12.3f}{args.draws / elapsed:>16,.0f}")
+    print(f"Speedup: {legacy_time / kernel_time:.0f}x (win rate {backtest.total_wins / backtest.total_tests * 100:.1f}%, "
+          f"max loss {backtest.max_consecutive_loss})")
+
+
+if __name__ == "__main__":
+    main()
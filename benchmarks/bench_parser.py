@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+"""
+Benchmark parser halaman hasil: implementasi lama (response.text + re.findall + strptime)
+dibandingkan StreamingResultParser pada halaman sintetis.
+
+Jalankan dari root repo:  python -m benchmarks.bench_parser [--cells 1000000]
+"""
+
+import argparse
+import re
+import time
+import tracemalloc
+from datetime import datetime
+
+from benchmarks.synthetic import synthetic_page
+from result_parser import DEFAULT_CHUNK_SIZE, parse_stream
+
+def legacy_parse(content):
+    """Salinan logika parse lama dari OptimizedBBFSSystem.fetch_complete_data"""
+    patterns = [
+        r'<td title="([^"]*=\d{4}-\d{2}-\d{2}=[^"]*)">(\d{4})</td>',
+        r'<td title="([^"]+)">(\d{4})</td>'
+    ]
+    data = []
+    for pattern in patterns:
+        for title_info, result in re.findall(pattern, content):
+            if '=' in title_info:
+                parts = title_info.split('=')
+                if len(parts) < 2:
+                    continue
+                try:
+                    date_obj = datetime.strptime(parts[1], '%Y-%m-%d')
+                    if 2020 <= date_obj.year <= 2025:
+                        data.append({
+                            'date': date_obj,
+                            'day': parts[0].lower(),
+                            'result': result,
+                            'last_2d': result[-2:],
+                            'all_digits': list(result)
+                        })
+                except ValueError:
+                    continue
+        if data:
+            break
+    data.sort(key=lambda x: x['date'])
+    return data
+
+
+def timed(func):
+    start = time.perf_counter()
+    result = func()
+    return result, time.perf_counter() - start
+
+
+def peak_memory(func):
+    """Peak alokasi selama func berjalan (dipisah dari timing karena overhead tracemalloc)"""
+    tracemalloc.start()
+    func()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return peak
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--cells', type=int, default=1_000_000)
+    parser.add_argument('--chunk-size', type=int, default=DEFAULT_CHUNK_SIZE)
+    args = parser.parse_args()
+
+    page = b''.join(synthetic_page(args.cells))
+    chunks = [page[i:i + args.chunk_size] for i in range(0, len(page), args.chunk_size)]
+    print(f"Halaman sintetis: {args.cells:,} cell, {len(page) / 1e6:.1f} MB, {len(chunks):,} chunk")
+
+    # Implementasi lama: seluruh body didecode menjadi str (response.text) sebelum diparse
+    legacy, legacy_time = timed(lambda: legacy_parse(page.decode('utf-8')))
+    legacy_count = len(legacy)
+    del legacy
+    streaming, stream_time = timed(lambda: parse_stream(chunks))
+    if len(streaming) != legacy_count:
+        raise SystemExit(f"Jumlah record berbeda: legacy={legacy_count}, streaming={len(streaming)}")
+    del streaming
+
+    # Chunk sudah dialokasikan sebelum tracing, sama seperti body yang masih di socket:
+    # legacy harus membuat str utuh (response.text), streaming hanya memegang satu chunk
+    legacy_peak = peak_memory(lambda: legacy_parse(page.decode('utf-8')))
+    stream_peak = peak_memory(lambda: parse_stream(chunks))
+
+    print(f"{'Parser':<12}{'Waktu (s)':>12}{'Cell/s':>14}{'Peak MB':>12}")
+    for name, elapsed, peak in (('legacy', legacy_time, legacy_peak), ('streaming', stream_time, stream_peak)):
+        print(f"{name:<12}{elapsed:>12.2f}{args.cells / elapsed:>14,.0f}{peak / 1e6:>12.1f}")
+    print(f"Speedup: {legacy_time / stream_time:.1f}x, memori puncak {legacy_peak / stream_peak:.1f}x lebih kecil")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,182 @@
+#!/usr/bin/env python3
+"""
+Benchmark skala pipeline BBFS (parse, pola, generate, backtest, intensive search) pada history sintetis.
+
+Setiap stage diukur waktu dan peak memorinya pada beberapa ukuran, lalu dibandingkan dengan
+baseline tersimpan (benchmarks/baselines.json); exit code 1 bila ada regresi. Sepenuhnya offline.
+
+Jalankan dari root repo:  python -m benchmarks.bench_scale [--sizes 2000,100000,10000000] [--save-baseline]
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import sys
+import time
+import tracemalloc
+
+import numpy as np
+
+from benchmarks.synthetic import synthetic_history, synthetic_page
+from draw_history import ULTRA_DAY_NAMES
+from optimized_bbfs_system import OptimizedBBFSSystem
+from result_parser import parse_stream
+from ultra_smart_bbfs import UltraSmartBBFS
+
+BASELINE_PATH = os.path.join(os.path.dirname(__file__), 'baselines.json')
+DEFAULT_SIZES = '2000,20000,100000'
+GENERATE_CALLS = 10000
+DAYS = ('senin', 'selasa', 'rabu', 'kamis', 'jumat', 'sabtu', 'minggu')
+# Selisih waktu absolut yang selalu ditoleransi (noise timer pada stage yang sangat cepat)
+TIME_SLACK = 0.05
+
+
+def make_system(history, with_patterns=False):
+    """Sistem dengan snapshot yang masih bisa ditulis, seperti salinan staging di _write"""
+    system = OptimizedBBFSSystem("http://synthetic.invalid/")
+    system._snapshot = system._snapshot.copy()
+    system.data = history
+    if with_patterns:
+        system._build_optimization_patterns()
+    return system
+
+
+def generate_many(system):
+    for i in range(GENERATE_CALLS):
+        system.generate_optimized_bbfs(f"{i % 100:02d}", DAYS[i % 7], i % 15)
+
+
+def make_ultra(draws, seed):
+    ultra = UltraSmartBBFS()
+    ultra.data = synthetic_history(draws, seed, day_names=ULTRA_DAY_NAMES)
+    return ultra
+
+
+def run_search(ultra):
+    ultra.deep_pattern_analysis()
+    ultra.intensive_search(max_iterations=1)
+
+
+# stage: (setup(draws, seed) -> state, run(state)); setup tidak ikut diukur
+STAGES = {
+    'parse': (lambda draws, seed: list(synthetic_page(draws, seed)), parse_stream),
+    'build_patterns': (lambda draws, seed: make_system(synthetic_history(draws, seed)),
+                       lambda system: system._build_optimization_patterns()),
+    'generate': (lambda draws, seed: make_system(synthetic_history(draws, seed), True), generate_many),
+    'backtest': (lambda draws, seed: make_system(synthetic_history(draws, seed), True),
+                 lambda system: system._test_comprehensive_performance()),
+    'intensive_search': (make_ultra, run_search),
+}
+
+
+def measure(stage, draws, seed, track_memory=True):
+    """(detik, peak MB) satu stage; memori diukur pada run terpisah karena overhead tracemalloc"""
+    setup, run = STAGES[stage]
+    with contextlib.redirect_stdout(io.StringIO()):
+        state = setup(draws, seed)
+        start = time.perf_counter()
+        run(state)
+        seconds = time.perf_counter() - start
+        del state
+
+        peak_mb = None
+        if track_memory:
+            state = setup(draws, seed)
+            tracemalloc.start()
+            run(state)
+            _, peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+            peak_mb = peak / 1e6
+    return seconds, peak_mb
+
+
+def load_baseline(path):
+    if not os.path.exists(path):
+        return {}
+    with open(path) as f:
+        return json.load(f).get('results', {})
+
+
+def save_baseline(path, results):
+    meta = {
+        'python': platform.python_version(),
+        'numpy': np.__version__,
+        'machine': platform.machine(),
+        'saved_at': time.strftime('%Y-%m-%d %H:%M:%S'),
+    }
+    with open(path, 'w') as f:
+        json.dump({'meta': meta, 'results': results}, f, indent=2, sort_keys=True)
+        f.write('\n')
+
+
+def regressions(seconds, peak_mb, baseline, time_tolerance, memory_tolerance):
+    """Daftar metrik yang melewati baseline x toleransi"""
+    found = []
+    if seconds > baseline['seconds'] * time_tolerance + TIME_SLACK:
+        found.append(f"waktu {seconds:.3f}s > {baseline['seconds']:.3f}s")
+    if peak_mb is not None and baseline.get('peak_mb') is not None and \
+            peak_mb > baseline['peak_mb'] * memory_tolerance + 0.1:
+        found.append(f"memori {peak_mb:.1f}MB > {baseline['peak_mb']:.1f}MB")
+    return found
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--sizes', default=DEFAULT_SIZES, help="Jumlah draw, dipisah koma")
+    parser.add_argument('--stages', default=','.join(STAGES), help="Stage yang dijalankan, dipisah koma")
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--search-max-draws', type=int, default=1_000_000,
+                        help="Ukuran terbesar untuk intensive_search (analisis per baris Python)")
+    parser.add_argument('--no-memory', action='store_true', help="Lewati pengukuran peak memori")
+    parser.add_argument('--baseline', default=BASELINE_PATH)
+    parser.add_argument('--save-baseline', action='store_true', help="Simpan hasil run ini sebagai baseline")
+    parser.add_argument('--time-tolerance', type=float, default=1.5)
+    parser.add_argument('--memory-tolerance', type=float, default=1.2)
+    args = parser.parse_args()
+
+    sizes = [int(size) for size in args.sizes.split(',')]
+    stages = args.stages.split(',')
+    unknown = [stage for stage in stages if stage not in STAGES]
+    if unknown:
+        raise SystemExit(f"Stage tidak dikenal: {', '.join(unknown)} (pilihan: {', '.join(STAGES)})")
+
+    baseline = load_baseline(args.baseline)
+    results = baseline if args.save_baseline else {}
+    failed = []
+
+    print(f"{'Stage':<18}{'Draws':>12}{'Waktu (s)':>12}{'Peak MB':>10}{'Baseline (s)':>14}  Status")
+    for stage in stages:
+        for draws in sizes:
+            if stage == 'intensive_search' and draws > args.search_max_draws:
+                continue
+            seconds, peak_mb = measure(stage, draws, args.seed, not args.no_memory)
+            results.setdefault(stage, {})[str(draws)] = {
+                'seconds': round(seconds, 4),
+                'peak_mb': round(peak_mb, 2) if peak_mb is not None else None,
+            }
+
+            previous = baseline.get(stage, {}).get(str(draws)) if not args.save_baseline else None
+            status = 'baru'
+            base_time = '-'
+            if previous:
+                base_time = f"{previous['seconds']:.3f}"
+                found = regressions(seconds, peak_mb, previous, args.time_tolerance, args.memory_tolerance)
+                status = 'REGRESI: ' + ', '.join(found) if found else 'ok'
+                if found:
+                    failed.append((stage, draws))
+            peak = f"{peak_mb:.1f}" if peak_mb is not None else '-'
+            print(f"{stage:<18}{draws:>12,}{seconds:>12.3f}{peak:>10}{base_time:>14}  {status}")
+            sys.stdout.flush()
+
+    if args.save_baseline:
+        save_baseline(args.baseline, results)
+        print(f"Baseline disimpan ke {args.baseline}")
+    if failed:
+        raise SystemExit(f"{len(failed)} regresi terhadap baseline")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,96 @@
+#!/usr/bin/env python3
+"""
+Generator history dan halaman hasil sintetis yang reproducible (seed tetap) untuk benchmark offline.
+
+Jalankan dari root repo:  python -m benchmarks.synthetic --draws 100000 --markets 3 --out /tmp/pages
+"""
+
+import argparse
+import math
+import os
+from datetime import date
+
+import numpy as np
+
+from draw_history import DAY_NAMES, DrawHistory
+
+DAY_NAMES_EN = ['Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday', 'Saturday', 'Sunday']
+# Window tanggal yang diterima parser
+WINDOW_START = date(2020, 1, 1)
+WINDOW_END = date(2025, 12, 31)
+ROWS_PER_CHUNK = 4096
+
+
+def market_seed(seed, market):
+    """Seed per market: setiap market punya hasil berbeda tetapi tetap reproducible"""
+    return seed * 1000 + market
+
+
+def synthetic_arrays(draw_count, seed=42, market=0, start=WINDOW_START, end=WINDOW_END):
+    """Kolom (ordinal, kode hari, hasil 4D) untuk draw_count draw di dalam window tanggal
+
+    Satu draw per hari selama window cukup; di atasnya beberapa draw berurutan berbagi tanggal
+    yang sama sehingga history tetap terurut dan semua tanggal valid berapa pun ukurannya.
+    """
+    days = end.toordinal() - start.toordinal() + 1
+    per_day = max(1, math.ceil(draw_count / days))
+    ordinals = (start.toordinal() + np.arange(draw_count) // per_day).astype(np.int32)
+    day_codes = ((ordinals - 1) % 7).astype(np.uint8)
+    rng = np.random.default_rng(market_seed(seed, market))
+    results = rng.integers(0, 10000, draw_count).astype(np.uint16)
+    return ordinals, day_codes, results
+
+
+def synthetic_history(draw_count, seed=42, market=0, day_names=DAY_NAMES):
+    """DrawHistory sintetis, identik dengan hasil parse synthetic_page dengan argumen yang sama"""
+    ordinals, day_codes, results = synthetic_arrays(draw_count, seed, market)
+    return DrawHistory.from_arrays(ordinals, day_codes, results, day_names)
+
+
+def synthetic_page(draw_count, seed=42, market=0):
+    """Halaman hasil sintetis sebagai generator chunk bytes (format cell sama dengan sumber)"""
+    ordinals, day_codes, results = synthetic_arrays(draw_count, seed, market)
+    yield b'<html><body><table>\n'
+    for begin in range(0, draw_count, ROWS_PER_CHUNK):
+        rows = []
+        for ordinal, day_code, result in zip(ordinals[begin:begin + ROWS_PER_CHUNK].tolist(),
+                                             day_codes[begin:begin + ROWS_PER_CHUNK].tolist(),
+                                             results[begin:begin + ROWS_PER_CHUNK].tolist()):
+            day = date.fromordinal(ordinal)
+            rows.append(f'<tr><td title="{DAY_NAMES_EN[day_code]}={day.isoformat()}={result:04d}">{result:04d}</td></tr>\n')
+        yield ''.join(rows).encode()
+    yield b'</table></body></html>\n'
+
+
+def synthetic_markets(draw_count, markets, seed=42):
+    """History sintetis untuk beberapa market sekaligus, {nama market: DrawHistory}"""
+    return {f"market-{market}": synthetic_history(draw_count, seed, market) for market in range(markets)}
+
+
+def write_pages(directory, draw_count, markets=1, seed=42):
+    """Tulis halaman setiap market ke directory/market-N.html, mengembalikan daftar path"""
+    os.makedirs(directory, exist_ok=True)
+    paths = []
+    for market in range(markets):
+        path = os.path.join(directory, f"market-{market}.html")
+        with open(path, 'wb') as f:
+            for chunk in synthetic_page(draw_count, seed, market):
+                f.write(chunk)
+        paths.append(path)
+    return paths
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--draws', type=int, default=2000)
+    parser.add_argument('--markets', type=int, default=1)
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--out', required=True, help="Directory tujuan halaman HTML")
+    args = parser.parse_args()
+
+    for path in write_pages(args.out, args.draws, args.markets, args.seed):
+        print(f"{path}: {os.path.getsize(path) / 1e6:.1f} MB")
+
+
+if __name__ == "__main__":
+    main()
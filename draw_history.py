@@ -0,0 +1,234 @@
+from collections.abc import Mapping
+from datetime import date, datetime
+import math
+
+import numpy as np
+
+# Kode hari: 0=senin ... 6=minggu (urutan sama dengan date.weekday())
+DAY_NAMES = ('senin', 'selasa', 'rabu', 'kamis', 'jumat', 'sabtu', 'minggu')
+ULTRA_DAY_NAMES = ('Senin', 'Selasa', 'Rabu', 'Kamis', 'Jumat', 'Sabtu', 'Minggu')
+DAY_CODES = {name: code for code, name in enumerate(DAY_NAMES)}
+
+ROW_KEYS = (
+    'date', 'day', 'result', 'last_2d', 'all_digits',
+    'digits', 'digit_sum', 'digit_product', 'even_count', 'odd_count'
+)
+
+
+def to_ordinal(value):
+    """Ordinal tanggal dari date/datetime, string 'YYYY-MM-DD' atau ordinal int"""
+    if isinstance(value, str):
+        return datetime.strptime(value, '%Y-%m-%d').toordinal()
+    if isinstance(value, date):
+        return value.toordinal()
+    return int(value)
+
+
+class DrawRow(Mapping):
+    """View ringan satu baris DrawHistory dengan interface dict lama"""
+    __slots__ = ('_history', '_index')
+
+    def __init__(self, history, index):
+        self._history = history
+        self._index = index
+
+    def __getitem__(self, key):
+        history = self._history
+        i = self._index
+        if key == 'date':
+            return datetime.fromordinal(int(history.ordinals[i]))
+        if key == 'day':
+            return history.day_names[history.day_codes[i]]
+        if key == 'result':
+            return f"{history.results[i]:04d}"
+        if key == 'last_2d':
+            return f"{history.last_2d[i]:02d}"
+        if key == 'all_digits':
+            return [str(d) for d in history.digits[i]]
+        if key == 'digits':
+            return [int(d) for d in history.digits[i]]
+        if key == 'digit_sum':
+            return int(history.digits[i].sum())
+        if key == 'digit_product':
+            return math.prod(int(d) for d in history.digits[i] if d > 0)
+        if key == 'even_count':
+            return int((history.digits[i] % 2 == 0).sum())
+        if key == 'odd_count':
+            return int((history.digits[i] % 2 == 1).sum())
+        raise KeyError(key)
+
+    def __iter__(self):
+        return iter(ROW_KEYS)
+
+    def __len__(self):
+        return len(ROW_KEYS)
+
+    def __repr__(self):
+        return f"DrawRow({self['date']:%Y-%m-%d}, {self['day']}, {self['result']})"
+
+
+class DrawHistory:
+    """Riwayat hasil berbasis array NumPy, terurut berdasarkan tanggal"""
+
+    def __init__(self, day_names=DAY_NAMES, capacity=0):
+        self.day_names = day_names
+        self._day_index = {name: code for code, name in enumerate(day_names)}
+        self._size = 0
+        self._allocate(capacity)
+
+    def _allocate(self, capacity):
+        self._ordinal_buf = np.zeros(capacity, dtype=np.int32)
+        self._day_buf = np.zeros(capacity, dtype=np.uint8)
+        self._result_buf = np.zeros(capacity, dtype=np.uint16)
+        self._last_2d_buf = np.zeros(capacity, dtype=np.uint8)
+        self._digit_buf = np.zeros((capacity, 4), dtype=np.uint8)
+        self._resize_views()
+
+    def _resize_views(self):
+        n = self._size
+        self.ordinals = self._ordinal_buf[:n]
+        self.day_codes = self._day_buf[:n]
+        self.results = self._result_buf[:n]
+        self.last_2d = self._last_2d_buf[:n]
+        self.digits = self._digit_buf[:n]
+
+    def _ensure_capacity(self, needed):
+        capacity = len(self._ordinal_buf)
+        if needed <= capacity:
+            return
+        new_capacity = max(needed, capacity * 2, 64)
+        old = (self._ordinal_buf, self._day_buf, self._result_buf, self._last_2d_buf, self._digit_buf)
+        n = self._size
+        self._allocate(new_capacity)
+        self._ordinal_buf[:n] = old[0][:n]
+        self._day_buf[:n] = old[1][:n]
+        self._result_buf[:n] = old[2][:n]
+        self._last_2d_buf[:n] = old[3][:n]
+        self._digit_buf[:n] = old[4][:n]
+
+    @classmethod
+    def from_arrays(cls, ordinals, day_codes, results, day_names=DAY_NAMES):
+        """Bangun history dari array (ordinal tanggal, kode hari, hasil 4D)"""
+        history = cls(day_names)
+        history._set_arrays(
+            np.asarray(ordinals, dtype=np.int32),
+            np.asarray(day_codes, dtype=np.uint8),
+            np.asarray(results, dtype=np.uint16)
+        )
+        return history
+
+    def _set_arrays(self, ordinals, day_codes, results, last_2d=None, digits=None):
+        if last_2d is None:
+            last_2d = (results % 100).astype(np.uint8)
+        if digits is None:
+            digits = np.empty((len(results), 4), dtype=np.uint8)
+            for pos, divisor in enumerate((1000, 100, 10, 1)):
+                digits[:, pos] = (results // divisor) % 10
+        # Buffer dari view/array eksternal: capacity = size, append berikutnya akan copy
+        self._ordinal_buf = ordinals
+        self._day_buf = day_codes
+        self._result_buf = results
+        self._last_2d_buf = last_2d
+        self._digit_buf = digits
+        self._size = len(results)
+        self._resize_views()
+
+    def day_code(self, day_name):
+        """Kode hari untuk nama hari, None jika tidak dikenal"""
+        return self._day_index.get(day_name)
+
+    def append(self, date_ordinal, day_code, result):
+        """Tambahkan satu hasil di ekor history"""
+        n = self._size
+        self._ensure_capacity(n + 1)
+        self._ordinal_buf[n] = date_ordinal
+        self._day_buf[n] = day_code
+        self._result_buf[n] = result
+        self._last_2d_buf[n] = result % 100
+        self._digit_buf[n] = (result // 1000, result // 100 % 10, result // 10 % 10, result % 10)
+        self._size = n + 1
+        self._resize_views()
+
+    def extend(self, other):
+        """Tambahkan semua baris history lain di ekor history ini"""
+        k = len(other)
+        if not k:
+            return
+        n = self._size
+        self._ensure_capacity(n + k)
+        self._ordinal_buf[n:n + k] = other.ordinals
+        self._day_buf[n:n + k] = other.day_codes
+        self._result_buf[n:n + k] = other.results
+        self._last_2d_buf[n:n + k] = other.last_2d
+        self._digit_buf[n:n + k] = other.digits
+        self._size = n + k
+        self._resize_views()
+
+    def sort(self):
+        """Urutkan berdasarkan tanggal (stabil)"""
+        order = np.argsort(self.ordinals, kind='stable')
+        self._set_arrays(
+            self.ordinals[order], self.day_codes[order], self.results[order],
+            self.last_2d[order], self.digits[order]
+        )
+
+    def _view(self, start, stop):
+        history = DrawHistory(self.day_names)
+        history._set_arrays(
+            self.ordinals[start:stop], self.day_codes[start:stop], self.results[start:stop],
+            self.last_2d[start:stop], self.digits[start:stop]
+        )
+        return history
+
+    def bounds(self, start=None, end=None):
+        """Indeks [lo, hi) draw bertanggal start..end (inklusif); bisect pada ordinal terurut, O(log n)"""
+        lo = 0 if start is None else int(np.searchsorted(self.ordinals, to_ordinal(start), side='left'))
+        hi = self._size if end is None else int(np.searchsorted(self.ordinals, to_ordinal(end), side='right'))
+        return lo, max(lo, hi)
+
+    def between(self, start=None, end=None):
+        """View (tanpa copy) draw bertanggal start..end; tanpa batas mengembalikan history ini sendiri"""
+        if start is None and end is None:
+            return self
+        return self._view(*self.bounds(start, end))
+
+    @property
+    def nbytes(self):
+        return (self._ordinal_buf.nbytes + self._day_buf.nbytes + self._result_buf.nbytes +
+                self._last_2d_buf.nbytes + self._digit_buf.nbytes)
+
+    def dates(self):
+        """Semua tanggal sebagai datetime"""
+        return [datetime.fromordinal(int(o)) for o in self.ordinals]
+
+    def __len__(self):
+        return self._size
+
+    def __getitem__(self, key):
+        if isinstance(key, slice):
+            start, stop, step = key.indices(self._size)
+            if step != 1:
+                indices = np.arange(start, stop, step)
+                history = DrawHistory(self.day_names)
+                history._set_arrays(
+                    self.ordinals[indices], self.day_codes[indices], self.results[indices],
+                    self.last_2d[indices], self.digits[indices]
+                )
+                return history
+            return self._view(start, max(start, stop))
+        index = int(key)
+        if index < 0:
+            index += self._size
+        if not 0 <= index < self._size:
+            raise IndexError('DrawHistory index out of range')
+        return DrawRow(self, index)
+
+    def __iter__(self):
+        for i in range(self._size):
+            yield DrawRow(self, i)
+
+    def __repr__(self):
+        if not self._size:
+            return 'DrawHistory(0 records)'
+        return (f"DrawHistory({self._size} records, "
+                f"{date.fromordinal(int(self.ordinals[0]))} - {date.fromordinal(int(self.ordinals[-1]))})")
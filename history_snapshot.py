@@ -0,0 +1,90 @@
+import os
+import sqlite3
+import threading
+from datetime import datetime
+
+DEFAULT_SNAPSHOT_PATH = os.path.join('.bbfs_cache', 'history.sqlite3')
+
+
+class HistorySnapshotStore:
+    """Snapshot lokal (SQLite) untuk record hasil yang sudah diparse, per URL sumber"""
+
+    def __init__(self, path=None):
+        self.path = path or os.getenv('BBFS_SNAPSHOT_PATH', DEFAULT_SNAPSHOT_PATH)
+        self._lock = threading.Lock()
+        self._initialized = False
+
+    def _connect(self):
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        conn = sqlite3.connect(self.path, timeout=10)
+        if not self._initialized:
+            conn.executescript('''
+                CREATE TABLE IF NOT EXISTS draws (
+                    url TEXT NOT NULL,
+                    seq INTEGER NOT NULL,
+                    date TEXT NOT NULL,
+                    day TEXT NOT NULL,
+                    result TEXT NOT NULL,
+                    PRIMARY KEY (url, seq)
+                );
+                CREATE TABLE IF NOT EXISTS sources (
+                    url TEXT PRIMARY KEY,
+                    etag TEXT,
+                    last_modified TEXT,
+                    saved_at TEXT NOT NULL
+                );
+            ''')
+            self._initialized = True
+        return conn
+
+    def save(self, url, records, etag=None, last_modified=None, start=0):
+        """Simpan record ke snapshot; start > 0 hanya menulis ekor record baru"""
+        rows = [
+            (url, seq, record['date'].strftime('%Y-%m-%d'), record['day'], record['result'])
+            for seq, record in enumerate(records[start:], start)
+        ]
+        with self._lock:
+            conn = self._connect()
+            try:
+                with conn:
+                    conn.execute('DELETE FROM draws WHERE url = ? AND seq >= ?', (url, start))
+                    conn.executemany('INSERT INTO draws VALUES (?, ?, ?, ?, ?)', rows)
+                    conn.execute(
+                        'INSERT OR REPLACE INTO sources VALUES (?, ?, ?, ?)',
+                        (url, etag, last_modified, datetime.now().strftime('%Y-%m-%d %H:%M:%S'))
+                    )
+            finally:
+                conn.close()
+
+    def load(self, url):
+        """Load snapshot untuk URL; mengembalikan (rows, meta) atau None jika belum ada"""
+        with self._lock:
+            if not os.path.exists(self.path):
+                return None
+            conn = self._connect()
+            try:
+                meta = conn.execute(
+                    'SELECT etag, last_modified, saved_at FROM sources WHERE url = ?', (url,)
+                ).fetchone()
+                if meta is None:
+                    return None
+                rows = conn.execute(
+                    'SELECT date, day, result FROM draws WHERE url = ? ORDER BY seq', (url,)
+                ).fetchall()
+            finally:
+                conn.close()
+
+        return rows, {'etag': meta[0], 'last_modified': meta[1], 'saved_at': meta[2]}
+
+
+# Shared store instance
+_snapshot_store = None
+
+def get_snapshot_store():
+    """Get shared snapshot store"""
+    global _snapshot_store
+    if _snapshot_store is None:
+        _snapshot_store = HistorySnapshotStore()
+    return _snapshot_store
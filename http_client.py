@@ -0,0 +1,163 @@
+import os
+import random
+import threading
+import time
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+
+USER_AGENT = 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
+# Total waktu (detik) satu fetch termasuk semua retry dan backoff
+DEFAULT_LATENCY_BUDGET = float(os.getenv('BBFS_FETCH_BUDGET', '45'))
+
+
+class CircuitOpenError(requests.ConnectionError):
+    """Sumber sedang dianggap mati; request ditolak tanpa menyentuh network"""
+
+
+class LatencyBudgetExceeded(requests.Timeout):
+    """Budget waktu fetch habis sebelum ada response yang berhasil"""
+
+
+class CircuitBreaker:
+    """Circuit breaker per host: buka setelah beberapa fetch gagal berturut-turut
+
+    Selama terbuka request langsung ditolak. Setelah reset_timeout satu request percobaan
+    diizinkan (half-open); berhasil menutup circuit, gagal membukanya lagi.
+    """
+
+    def __init__(self, failure_threshold=3, reset_timeout=60):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.failures = 0
+        self.opened_at = None
+        self._trial = False
+        self._lock = threading.Lock()
+
+    @property
+    def state(self):
+        if self.opened_at is None:
+            return 'closed'
+        if time.monotonic() - self.opened_at >= self.reset_timeout:
+            return 'half-open'
+        return 'open'
+
+    def allow(self):
+        with self._lock:
+            state = self.state
+            if state == 'closed':
+                return True
+            if state == 'half-open' and not self._trial:
+                self._trial = True
+                return True
+            return False
+
+    def record_success(self):
+        with self._lock:
+            self.failures = 0
+            self.opened_at = None
+            self._trial = False
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            self._trial = False
+            if self.opened_at is not None or self.failures >= self.failure_threshold:
+                self.opened_at = time.monotonic()
+
+
+def _retryable(error):
+    """Gangguan koneksi, timeout dan 5xx layak diulang; 4xx tidak"""
+    if isinstance(error, requests.HTTPError):
+        return error.response is not None and error.response.status_code >= 500
+    return isinstance(error, (requests.ConnectionError, requests.Timeout))
+
+
+class HttpClient:
+    """Satu Session keep-alive untuk semua fetch sumber, dengan retry dan circuit breaker
+
+    Retry memakai exponential backoff dengan full jitter, dan seluruh percobaan dibatasi
+    latency_budget sehingga pemanggil tidak pernah menunggu lebih lama dari budget.
+    """
+
+    def __init__(self, max_retries=3, backoff_base=0.5, backoff_cap=8.0,
+                 latency_budget=DEFAULT_LATENCY_BUDGET, failure_threshold=3, reset_timeout=60,
+                 pool_size=8, recorder=None):
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_cap = backoff_cap
+        self.latency_budget = latency_budget
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+        self.session.headers['User-Agent'] = USER_AGENT
+        # source_replay.Recorder: salin setiap respons 200 ke disk untuk diputar ulang offline
+        self.recorder = recorder
+        self._breakers = {}
+        self._lock = threading.Lock()
+
+    def breaker(self, url):
+        host = urlsplit(url).netloc
+        with self._lock:
+            breaker = self._breakers.get(host)
+            if breaker is None:
+                breaker = self._breakers[host] = CircuitBreaker(self.failure_threshold, self.reset_timeout)
+            return breaker
+
+    def backoff(self, attempt):
+        return random.uniform(0, min(self.backoff_cap, self.backoff_base * 2 ** attempt))
+
+    def get(self, url, headers=None, timeout=30, stream=True, budget=None):
+        """GET dengan retry; response 2xx/3xx dikembalikan, selain itu exception requests"""
+        breaker = self.breaker(url)
+        if not breaker.allow():
+            raise CircuitOpenError(f"Circuit terbuka untuk {url}, sumber dilewati sementara")
+
+        deadline = time.monotonic() + (self.latency_budget if budget is None else budget)
+        attempt = 0
+        while True:
+            remaining = deadline - time.monotonic()
+            try:
+                if remaining <= 0:
+                    raise LatencyBudgetExceeded(f"Budget fetch habis untuk {url}")
+                response = self.session.get(url, headers=headers, timeout=min(timeout, remaining), stream=stream)
+                response.raise_for_status()
+            except requests.RequestException as e:
+                # HTTPError dari raise_for_status: lepaskan koneksi response yang gagal
+                if e.response is not None:
+                    e.response.close()
+                attempt += 1
+                delay = self.backoff(attempt - 1)
+                if (attempt >= self.max_retries or not _retryable(e) or
+                        time.monotonic() + delay >= deadline):
+                    breaker.record_failure()
+                    raise
+                print(f"Attempt {attempt} failed ({e}), retrying in {delay:.1f}s...")
+                time.sleep(delay)
+                continue
+            breaker.record_success()
+            if self.recorder is not None:
+                response = self.recorder.capture(url, response)
+            return response
+
+
+_client = None
+_client_lock = threading.Lock()
+
+
+def get_http_client():
+    """HttpClient bersama untuk seluruh proses; BBFS_RECORD_DIR mengaktifkan perekaman respons"""
+    global _client
+    with _client_lock:
+        if _client is None:
+            record_dir = os.getenv('BBFS_RECORD_DIR')
+            recorder = None
+            if record_dir:
+                from source_replay import Recorder
+                recorder = Recorder(record_dir)
+            _client = HttpClient(recorder=recorder)
+        return _client
@@ -0,0 +1,62 @@
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
+
+from http_client import get_http_client
+from optimized_bbfs_system import OptimizedBBFSSystem, register_snapshot
+
+
+def download(url, timeout=30):
+    """Body halaman hasil beserta validator HTTP-nya (Session bersama, retry dan circuit breaker)"""
+    response = get_http_client().get(url, timeout=timeout, stream=False)
+    return response.content, response.headers.get('ETag'), response.headers.get('Last-Modified')
+
+
+def build_snapshot(url, content, etag=None, last_modified=None):
+    """Parse, bangun pola dan backtest satu market; dijalankan di worker process"""
+    system = OptimizedBBFSSystem(url)
+    if not system.load_page(content, etag, last_modified):
+        raise ValueError(f"Data tidak cukup dari {url}")
+    return system.snapshot()
+
+
+def fetch_markets(urls, max_workers=8, processes=None, timeout=30):
+    """Fetch dan analisis beberapa market sekaligus, mengembalikan (snapshots, errors) per URL
+
+    Download berjalan di thread pool lewat HTTP client bersama; setiap halaman yang selesai
+    langsung diteruskan ke process pool untuk parse, build_optimization_patterns dan backtest.
+    Wall time mendekati market paling lambat, bukan jumlah semuanya.
+    """
+    urls = list(dict.fromkeys(urls))
+    snapshots = {}
+    errors = {}
+    if not urls:
+        return snapshots, errors
+
+    workers = min(max_workers, len(urls))
+    with ThreadPoolExecutor(max_workers=workers) as downloads, \
+            ProcessPoolExecutor(max_workers=processes) as builds:
+        pending = {downloads.submit(download, url, timeout): url for url in urls}
+        built = {}
+        for future in as_completed(pending):
+            url = pending[future]
+            try:
+                built[builds.submit(build_snapshot, url, *future.result())] = url
+            except Exception as e:
+                errors[url] = e
+
+        for future in as_completed(built):
+            url = built[future]
+            try:
+                snapshots[url] = future.result()
+            except Exception as e:
+                errors[url] = e
+
+    for url, error in errors.items():
+        print(f"Error memuat {url}: {error}")
+    return snapshots, errors
+
+
+def load_markets(urls, **kwargs):
+    """Seperti fetch_markets, lalu pasang setiap snapshot ke registry sistem per URL"""
+    snapshots, errors = fetch_markets(urls, **kwargs)
+    systems = {url: register_snapshot(snapshot) for url, snapshot in snapshots.items()}
+    return systems, errors
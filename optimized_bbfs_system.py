@@ -1,106 +1,381 @@
-import requests
-import re
-from datetime import datetime, timedelta
-from collections import Counter, defaultdict
+from datetime import date, datetime, timedelta
+from collections import Counter
+import copy
 import random
-import time
+import threading
+import numpy as np
+from bbfs_backtest import BacktestCheckpoint, WalkForwardBacktest, backtest_history, mask_to_string
+from bbfs_model import DEFAULT_PARAMS, PatternModel
+from draw_history import DAY_CODES, DrawHistory, to_ordinal
+from history_snapshot import get_snapshot_store
+from http_client import get_http_client
+from refresh_scheduler import RefreshScheduler
+from result_parser import parse_content, parse_response
+from single_flight import SingleFlight
+from system_registry import SystemRegistry
+
+# Load/refresh per URL untuk seluruh proses (semua sesi Streamlit berbagi satu download)
+_loads = SingleFlight()
+LOAD_TTL = 60
+MAX_RANGED_SNAPSHOTS = 8
+# Hasil request_refresh bila refresh diserahkan ke scheduler background
+REFRESH_SCHEDULED = 'scheduled'
+# Field snapshot yang tidak memengaruhi analisis; snapshot turunan mengikuti nilai terbarunya
+RANGED_META_FIELDS = ('version', 'last_updated', 'etag', 'last_modified', 'new_records')
+
+DEFAULT_URL = "http://178.128.121.191/"
+
+class Snapshot:
+    """Versi immutable dari state sistem: sumber, history, model, backtest dan hasil performance
+    
+    Pembaca mengambil satu snapshot per rerun (OptimizedBBFSSystem.snapshot()) dan membacanya
+    tanpa lock. Writer menyiapkan salinan, lalu mempublikasikan penggantinya; snapshot yang sudah
+    dipublikasikan tidak bisa diubah lagi.
+    """
+    
+    def __init__(self, url):
+        self.url = url
+        # Naik setiap kali snapshot baru dipublikasikan
+        self.version = 0
+        self.data = DrawHistory()
+        # Rentang tanggal analisis (ordinal awal, ordinal akhir; None = terbuka). Pola, backtest
+        # dan tampilan hasil memakai view history di rentang ini, data lengkap tetap utuh
+        self.date_range = (None, None)
+        # Knob generate BBFS (BBFSParams); model dan backtest dibangun dengan params ini
+        self.params = DEFAULT_PARAMS
+        self.optimization_cache = None
+        # Naik setiap kali data berubah (append maupun ganti total)
+        self.data_version = 0
+        # Checkpoint backtest: walk-forward dilanjutkan per draw, in-sample dihitung ulang vectorized
+        self.walk_forward = None
+        self.in_sample = None
+        # Kolom per-langkah backtest in-sample (mask BBFS, win, streak) untuk tampilan live
+        self.backtest = None
+        self.performance_data = {}
+        self.last_updated = None
+        # Validator HTTP untuk refresh inkremental
+        self.etag = None
+        self.last_modified = None
+        self.new_records = 0
+    
+    def __setattr__(self, name, value):
+        if self.__dict__.get('_frozen'):
+            raise AttributeError(f"Snapshot v{self.version} sudah dipublikasikan dan tidak bisa diubah")
+        object.__setattr__(self, name, value)
+    
+    def copy(self):
+        """Salinan yang masih bisa diubah; history, model dan checkpoint disalin saat ditulis"""
+        snapshot = copy.copy(self)
+        snapshot.__dict__['_frozen'] = False
+        return snapshot
+    
+    def freeze(self):
+        self.__dict__['_frozen'] = True
+        return self
+    
+    @property
+    def history(self):
+        """View data di dalam date_range, dicari dengan bisect (O(log n)) dan tanpa copy"""
+        cached = self.__dict__.get('_history')
+        if cached is None or cached[0] is not self.data or cached[1] != self.date_range:
+            cached = self.__dict__['_history'] = (self.data, self.date_range, self.data.between(*self.date_range))
+        return cached[2]
+    
+    @property
+    def nbytes(self):
+        """Perkiraan memori array history, model dan backtest"""
+        parts = (self.data, self.optimization_cache, self.backtest, self.walk_forward)
+        return sum(part.nbytes for part in parts if part is not None)
+    
+    def __repr__(self):
+        return f"Snapshot(v{self.version}, {self.url}, {len(self.data)} records)"
+
+def _snapshot_field(name):
+    """Atribut sistem yang dibaca dari snapshot aktif (hanya bisa ditulis pada salinan writer)"""
+    return property(
+        lambda self: getattr(self._snapshot, name),
+        lambda self, value: setattr(self._snapshot, name, value)
+    )
+
+def _step_bbfs(snapshot, i):
+    """BBFS (urutan asli) yang dipakai backtest snapshot pada langkah i"""
+    data = snapshot.history
+    row = snapshot.optimization_cache.table[data.day_codes[i], data.last_2d[i], snapshot.backtest.bucket[i]]
+    return [str(digit) for digit in row.tolist()]
+
+def _step_detail(snapshot, i):
+    """Detail win/loss untuk langkah backtest i"""
+    backtest = snapshot.backtest
+    current = snapshot.history[i]
+    next_item = snapshot.history[i + 1]
+    detail = {
+        'date': current['date'],
+        'result': current['result'],
+        'next': next_item['result'],
+        'bbfs': mask_to_string(int(backtest.bbfs_mask[i])),  # Sort untuk konsistensi
+        'day': current['day'],
+        'input_2d': current['last_2d'],
+        'actual_2d': next_item['last_2d']
+    }
+    if not backtest.win[i]:
+        detail['loss_number'] = int(backtest.streak[i])
+    return detail
+
+def _step_result(snapshot, i):
+    """Ringkasan hasil untuk langkah backtest i"""
+    backtest = snapshot.backtest
+    current = snapshot.history[i]
+    return {
+        'date': current['date'],
+        'input_2d': current['last_2d'],
+        'next_2d': snapshot.history[i + 1]['last_2d'],
+        'bbfs': _step_bbfs(snapshot, i),
+        'is_win': bool(backtest.win[i]),
+        'consecutive_losses': int(backtest.streak[i])
+    }
 
 class OptimizedBBFSSystem:
-    def __init__(self, data_url=None):
+    url = _snapshot_field('url')
+    data = _snapshot_field('data')
+    date_range = _snapshot_field('date_range')
+    params = _snapshot_field('params')
+    history = property(lambda self: self._snapshot.history)
+    optimization_cache = _snapshot_field('optimization_cache')
+    data_version = _snapshot_field('data_version')
+    walk_forward = _snapshot_field('walk_forward')
+    in_sample = _snapshot_field('in_sample')
+    backtest = _snapshot_field('backtest')
+    performance_data = _snapshot_field('performance_data')
+    last_updated = _snapshot_field('last_updated')
+    etag = _snapshot_field('etag')
+    last_modified = _snapshot_field('last_modified')
+    new_records = _snapshot_field('new_records')
+    
+    def __init__(self, data_url=None, snapshot_store=None):
         # Make the main URL customizable, with a configurable default
-        self.url = data_url if data_url else "http://178.128.121.191/"
-        self.data = []
+        self._snapshot = Snapshot(data_url if data_url else DEFAULT_URL).freeze()
         self.performance_cache = {}
         self.loss_analysis = {}
-        self.optimization_cache = {}
-        self.last_updated = None
+        self.refresh_timeout = 10
+        self.snapshot_store = snapshot_store
+        self.scheduler = None
+        self._scheduler_lock = threading.Lock()
+        # Snapshot turunan per (versi data, params, rentang tanggal) untuk sesi yang memilih
+        # periode sendiri; dibaca dan diisi dari thread pembaca, jadi dijaga lock sendiri
+        self._ranged = {}
+        self._ranged_lock = threading.Lock()
+        # Writer (scheduler, tombol refresh) dijalankan bergantian; pembaca tidak pernah dikunci
+        self._write_lock = threading.RLock()
+    
+    def snapshot(self, start=None, end=None):
+        """Snapshot aktif; ambil sekali per rerun lalu teruskan ke method get_*
+        
+        Dengan start/end: snapshot turunan yang pola dan backtest-nya dihitung hanya pada draw
+        di rentang tersebut (view history, tanpa copy data), di-cache per versi data dan params.
+        Publikasi tanpa perubahan data (mis. refresh 304) tidak membuang cache ini.
+        """
+        snapshot = self._snapshot
+        if start is None and end is None:
+            return snapshot
+        key = (snapshot.data_version, snapshot.params,
+               to_ordinal(start) if start is not None else None,
+               to_ordinal(end) if end is not None else None)
+        with self._ranged_lock:
+            ranged = self._ranged.pop(key, None)
+            if ranged is not None:
+                # LRU: entri yang dipakai dipindah ke akhir
+                self._ranged[key] = ranged
+        
+        if ranged is None:
+            staging = copy.copy(self)
+            staging._snapshot = snapshot.copy()
+            staging._set_date_range(start, end)
+            staging._prepare()
+            ranged = staging._snapshot.freeze()
+        elif ranged.version != snapshot.version:
+            # Data sama, hanya metadata (waktu refresh, validator, versi) yang baru
+            ranged = ranged.copy()
+            for name in RANGED_META_FIELDS:
+                setattr(ranged, name, getattr(snapshot, name))
+            ranged.freeze()
+        else:
+            return ranged
+        
+        with self._ranged_lock:
+            # Hanya data dan params terbaru yang relevan; batasi jumlah rentang yang disimpan
+            self._ranged = {k: v for k, v in self._ranged.items() if k[:2] == key[:2]}
+            self._ranged.pop(key, None)
+            while len(self._ranged) >= MAX_RANGED_SNAPSHOTS:
+                self._ranged.pop(next(iter(self._ranged)))
+            self._ranged[key] = ranged
+        return ranged
+    
+    @property
+    def nbytes(self):
+        return self._snapshot.nbytes
+    
+    def close(self):
+        """Hentikan refresh terjadwal (dipanggil saat sistem dikeluarkan dari registry)"""
+        if self.scheduler is not None:
+            self.scheduler.stop()
+        # Hasil load/refresh milik sistem ini tidak boleh dipakai sistem baru untuk URL yang sama
+        _loads.forget(('load', self.url))
+        _loads.forget(('refresh', self.url))
+    
+    def _write(self, update, *args):
+        """Jalankan update pada salinan snapshot di samping, lalu publikasikan dengan satu swap referensi
+        
+        Sebelum dipublikasikan, model, tabel BBFS dan backtest untuk data baru sudah siap,
+        sehingga pembaca hanya pernah melihat snapshot lama atau snapshot baru yang lengkap.
+        """
+        with self._write_lock:
+            staging = copy.copy(self)
+            staging._snapshot = self._snapshot.copy()
+            result = update(staging, *args)
+            staging._prepare()
+            snapshot = staging._snapshot
+            snapshot.version = self._snapshot.version + 1
+            self._snapshot = snapshot.freeze()
+        return result
+    
+    def _prepare(self):
+        """Bangun model, tabel dan performance yang belum ada untuk state ini"""
+        if len(self.history) < 2:
+            return
+        if not self.optimization_cache:
+            self._build_optimization_patterns()
+        self.optimization_cache.ensure_table()
+        if not self.performance_data:
+            self._run_performance_test()
+    
+    def _download(self, extra_headers=None, timeout=30):
+        """Download halaman sumber lewat HTTP client bersama (keep-alive, backoff, circuit breaker)"""
+        return get_http_client().get(self.url, headers=extra_headers, timeout=timeout)
+    
+    def _remember_validators(self, response):
+        """Simpan ETag / Last-Modified untuk conditional request berikutnya"""
+        self.etag = response.headers.get('ETag')
+        self.last_modified = response.headers.get('Last-Modified')
+    
+    def replace_data(self, data):
+        """Ganti seluruh history; pola dan hasil performance dibangun ulang sebelum dipublikasikan"""
+        return self._write(OptimizedBBFSSystem._replace_data, data)
+    
+    def _replace_data(self, data):
+        self.data = data
+        self.optimization_cache = None
+        self.performance_data = {}
+        self.walk_forward = None
+        self.in_sample = None
+        self.backtest = None
+        self.data_version += 1
+    
+    def set_date_range(self, start=None, end=None):
+        """Batasi analisis (pola, backtest, hasil terbaru) ke draw bertanggal start..end"""
+        return self._write(OptimizedBBFSSystem._set_date_range, start, end)
+    
+    def _set_date_range(self, start, end):
+        date_range = (to_ordinal(start) if start is not None else None,
+                      to_ordinal(end) if end is not None else None)
+        if date_range == self.date_range:
+            return False
+        self.date_range = date_range
+        self.optimization_cache = None
+        self.performance_data = {}
+        self.walk_forward = None
+        self.in_sample = None
+        self.backtest = None
+        return True
+    
+    def set_params(self, params):
+        """Ganti knob generate BBFS (BBFSParams); pola dan backtest dibangun ulang dengan params baru"""
+        return self._write(OptimizedBBFSSystem._set_params, params)
+    
+    def _set_params(self, params):
+        if params == self.params:
+            return False
+        self.params = params
+        self.optimization_cache = None
+        self.performance_data = {}
+        self.walk_forward = None
+        self.in_sample = None
+        self.backtest = None
+        return True
+    
+    def append_draws(self, draws):
+        """Tambahkan draw baru (DrawHistory terurut) di ekor data dengan update pola O(k)
         
+        Hitungan day/input/global bersifat aditif, jadi model cukup menerima transisi baru
+        (draw terakhir lama -> draw baru pertama, dan seterusnya) tanpa memindai ulang history.
+        """
+        return self._write(OptimizedBBFSSystem._append_draws, draws)
+    
+    def _append_draws(self, draws):
+        k = len(draws)
+        if not k:
+            return 0
+        if self.data and draws.ordinals[0] < self.data.ordinals[-1]:
+            raise ValueError("Draw baru harus berada setelah draw terakhir")
+        
+        # Copy-on-write: history, model dan checkpoint versi lama tetap utuh untuk pembaca
+        size = len(self.data)
+        start = len(self.history)
+        data = DrawHistory(self.data.day_names, capacity=size + k)
+        data.extend(self.data)
+        data.extend(draws)
+        self.data = data
+        
+        # Awal rentang analisis tidak berubah, jadi draw baru (yang masuk rentang) hanya
+        # menambah ekor view history
+        history = self.history
+        model = self.optimization_cache
+        if model is not None and model.transitions == start - 1:
+            model = self.optimization_cache = model.copy()
+            day_codes = history.day_codes.tolist()
+            last_2d = history.last_2d.tolist()
+            for i in range(max(start - 1, 0), len(history) - 1):
+                model.add_transition(day_codes[i], last_2d[i], last_2d[i + 1])
+        else:
+            self.optimization_cache = None
+        
+        self.data_version += 1
+        if self.performance_data and self.walk_forward is not None:
+            # Lanjutkan checkpoint, bukan replay seluruh history
+            self.walk_forward = self.walk_forward.copy()
+            self.walk_forward.extend(self.history)
+            self._update_performance()
+        else:
+            self.performance_data = {}
+        return k
+    
+    def parse_records(self, content):
+        """Parse HTML hasil menjadi DrawHistory yang sudah diurutkan berdasarkan tanggal"""
+        return parse_content(content)
+    
     def fetch_complete_data(self):
-        """Fetch complete data from 2020-2025"""
+        """Fetch complete data (window tahun: BBFS_MIN_YEAR - BBFS_MAX_YEAR)"""
+        return self._write(OptimizedBBFSSystem._fetch_complete_data)
+    
+    def _fetch_complete_data(self):
         try:
-            print("Mengambil data lengkap dari 2020-2025...")
-            # Add retry logic for production deployment
-            max_retries = 3
-            content = ""
-            for attempt in range(max_retries):
-                try:
-                    response = requests.get(
-                        self.url, 
-                        timeout=30,
-                        headers={'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'}
-                    )
-                    response.raise_for_status()
-                    content = response.text
-                    break
-                except requests.RequestException as e:
-                    if attempt == max_retries - 1:
-                        raise e
-                    print(f"Attempt {attempt + 1} failed, retrying...")
-                    time.sleep(2)
-            
-            # Try multiple patterns to support different URL formats
-            patterns = [
-                # Original format: title="Friday=2025-06-20=1234"
-                r'<td title="([^"]*=\d{4}-\d{2}-\d{2}=[^"]*)">(\d{4})</td>',
-                # New format: title="Friday=2021-01-01=2030"
-                r'<td title="([^"]+)">(\d{4})</td>'
-            ]
-            
-            data = []
-            for pattern in patterns:
-                matches = re.findall(pattern, content)
-                
-                for match in matches:
-                    title_info = match[0]
-                    result = match[1]
-                    
-                    # Handle different title formats
-                    if '=' in title_info:
-                        parts = title_info.split('=')
-                        if len(parts) >= 3:
-                            # Format: Friday=2021-01-01=2030
-                            day_name = parts[0]
-                            date_str = parts[1]
-                        elif len(parts) >= 2:
-                            # Format: Friday=2025-06-20
-                            day_name = parts[0]
-                            date_str = parts[1]
-                        else:
-                            continue
-                        
-                        try:
-                            date_obj = datetime.strptime(date_str, '%Y-%m-%d')
-                            if 2020 <= date_obj.year <= 2025:
-                                data.append({
-                                    'date': date_obj,
-                                    'day': self.standardize_day(day_name),
-                                    'result': result,
-                                    'last_2d': result[-2:],
-                                    'all_digits': list(result)
-                                })
-                        except ValueError:
-                            continue
-                
-                # If we found data with this pattern, break
-                if data:
-                    break
+            print("Mengambil data lengkap...")
+            response = self._download()
+            # Parse streaming per chunk, body tidak pernah disimpan utuh di memory
+            parser, data = parse_response(response)
             
             # Validate and filter data
             if not data:
                 print("Error: Tidak ada data ditemukan dengan pattern yang tersedia")
                 print(f"URL: {self.url}")
-                print(f"Content length: {len(content)} chars")
-                # Debug: show first few td elements found
-                debug_matches = re.findall(r'<td[^>]*title="[^"]*"[^>]*>(\d{4})</td>', content)
-                print(f"Debug: Found {len(debug_matches)} potential matches")
-                if debug_matches:
-                    print(f"Sample matches: {debug_matches[:5]}")
+                print(f"Content length: {parser.bytes_seen} bytes")
+                print(f"Debug: Found {parser.cells_seen} potential matches")
                 return False
             
-            # Sort by date ascending
-            data.sort(key=lambda x: x['date'])
-            self.data = data
+            self._replace_data(data)
             self.last_updated = datetime.now()
+            self.new_records = len(data)
+            self._remember_validators(response)
+            self.save_snapshot()
             
             print(f"✓ Data berhasil dimuat: {len(self.data)} records dari {data[0]['date'].year}-{data[-1]['date'].year}")
             # Accept data if we have reasonable amount (flexible threshold for different sources)
@@ -110,6 +385,181 @@ class OptimizedBBFSSystem:
             print(f"Error loading data: {e}")
             return False
     
+    def load_page(self, content, etag=None, last_modified=None):
+        """Muat halaman hasil yang sudah di-download (mis. oleh batch multi-market)"""
+        return self._write(OptimizedBBFSSystem._load_page, content, etag, last_modified)
+    
+    def _load_page(self, content, etag, last_modified):
+        data = self.parse_records(content)
+        if not data:
+            print(f"Error: Tidak ada data ditemukan di {self.url}")
+            return False
+        self._replace_data(data)
+        self.last_updated = datetime.now()
+        self.new_records = len(data)
+        self.etag = etag
+        self.last_modified = last_modified
+        print(f"✓ Data berhasil dimuat: {len(self.data)} records dari {self.url}")
+        return len(self.data) >= 100
+    
+    def install_snapshot(self, snapshot):
+        """Publikasikan snapshot siap pakai yang dibangun di luar sistem ini (mis. di process pool)"""
+        return self._write(OptimizedBBFSSystem._install_snapshot, snapshot)
+    
+    def _install_snapshot(self, snapshot):
+        if snapshot.url != self.url:
+            raise ValueError(f"Snapshot untuk {snapshot.url}, bukan {self.url}")
+        previous = self._snapshot
+        self._snapshot = snapshot.copy()
+        # Snapshot dari sistem lain punya penghitung sendiri; pastikan versi datanya baru di sini
+        self.data_version = max(previous.data_version, snapshot.data_version) + 1
+        self.save_snapshot()
+        return True
+    
+    def refresh_data(self):
+        """Refresh inkremental: conditional request dan hanya tambahkan tanggal baru di ekor data"""
+        return self._write(OptimizedBBFSSystem._refresh_data)
+    
+    def _refresh_data(self):
+        if not self.data:
+            return self._fetch_complete_data()
+        
+        try:
+            headers = {}
+            if self.etag:
+                headers['If-None-Match'] = self.etag
+            if self.last_modified:
+                headers['If-Modified-Since'] = self.last_modified
+            
+            response = self._download(headers, timeout=self.refresh_timeout)
+            self.last_updated = datetime.now()
+            
+            # 304: sumber tidak berubah, tidak ada yang perlu diparse
+            if response.status_code == 304:
+                response.close()
+                self.new_records = 0
+                print("✓ Data sudah terbaru (304 Not Modified)")
+                return True
+            
+            _, data = parse_response(response)
+            if not data:
+                print("Error: Tidak ada data ditemukan saat refresh")
+                return False
+            
+            # Pastikan hanya ekor yang berubah: semua record lama harus tetap sama
+            prefix_count = int(np.searchsorted(data.ordinals, self.data.ordinals[-1], side='right'))
+            
+            tail = data[prefix_count:]
+            prefix_unchanged = (
+                prefix_count == len(self.data) and
+                np.array_equal(data.results[:prefix_count], self.data.results)
+            )
+            
+            if prefix_unchanged:
+                snapshot_start = len(self.data)
+                self.new_records = self._append_draws(tail)
+                print(f"✓ Refresh inkremental: {len(tail)} record baru")
+            else:
+                # Riwayat lama berubah di sumber, ganti seluruhnya
+                self._replace_data(data)
+                self.new_records = len(data)
+                snapshot_start = 0
+                print(f"✓ Riwayat sumber berubah, data dimuat ulang: {len(data)} records")
+            
+            self._remember_validators(response)
+            self.save_snapshot(snapshot_start)
+            return len(self.data) >= 100
+            
+        except Exception as e:
+            print(f"Error refreshing data: {e}")
+            return False
+    
+    def load_snapshot(self):
+        """Warm start dari snapshot lokal tanpa menyentuh network"""
+        return self._write(OptimizedBBFSSystem._load_snapshot)
+    
+    def _load_snapshot(self):
+        if self.snapshot_store is None:
+            return False
+        
+        try:
+            snapshot = self.snapshot_store.load(self.url)
+        except Exception as e:
+            print(f"Error loading snapshot: {e}")
+            return False
+        if not snapshot:
+            return False
+        
+        rows, meta = snapshot
+        if not rows:
+            return False
+        data = DrawHistory.from_arrays(
+            [datetime.strptime(date_str, '%Y-%m-%d').toordinal() for date_str, _, _ in rows],
+            [DAY_CODES[self.standardize_day(day)] for _, day, _ in rows],
+            [int(result) for _, _, result in rows]
+        )
+        
+        self._replace_data(data)
+        self.etag = meta['etag']
+        self.last_modified = meta['last_modified']
+        self.last_updated = datetime.strptime(meta['saved_at'], '%Y-%m-%d %H:%M:%S')
+        print(f"✓ Snapshot lokal dimuat: {len(self.data)} records (disimpan {meta['saved_at']})")
+        return True
+    
+    def save_snapshot(self, start=0):
+        """Simpan data saat ini ke snapshot lokal"""
+        if self.snapshot_store is None or not self.data:
+            return
+        try:
+            self.snapshot_store.save(self.url, self.data, self.etag, self.last_modified, start)
+        except Exception as e:
+            print(f"Error saving snapshot: {e}")
+    
+    def start_scheduler(self, poll_now=False, **kwargs):
+        """Jalankan refresh terjadwal di background thread; poll_now memicu poll segera"""
+        with self._scheduler_lock:
+            if self.scheduler is None:
+                self.scheduler = RefreshScheduler(self, **kwargs)
+            return self.scheduler.start(poll_now)
+    
+    def ensure_loaded(self, ttl=LOAD_TTL):
+        """Pastikan data sudah dimuat; sesi bersamaan menunggu satu fetch yang sama"""
+        if self.data:
+            return self.run_performance_test()
+        return self._single_flight('load', self._load_stale_or_fetch, ttl)
+    
+    def _single_flight(self, action, func, ttl):
+        """_loads.do per (action, url); hanya hasil sukses yang dipakai ulang selama ttl"""
+        key = (action, self.url)
+        try:
+            success = _loads.do(key, func, ttl)
+        except Exception:
+            _loads.forget(key)
+            raise
+        if not success:
+            # Kegagalan tidak di-cache; pemanggil berikutnya mencoba lagi
+            _loads.forget(key)
+        return success
+    
+    def _load_stale_or_fetch(self):
+        # Stale-while-revalidate: snapshot terakhir yang baik langsung disajikan dan sumber
+        # (yang mungkin lambat atau mati) direfresh di background; fetch hanya bila belum ada
+        if self.load_snapshot():
+            self.start_scheduler(poll_now=True)
+            return True
+        return self.fetch_complete_data()
+    
+    def request_refresh(self, ttl=LOAD_TTL):
+        """Minta refresh tanpa menunggu network bila data sudah ada
+        
+        REFRESH_SCHEDULED jika berjalan di background; tanpa data, refresh dijalankan langsung
+        dan hasil refresh_data (True/False) dikembalikan.
+        """
+        if self.data:
+            self.start_scheduler(poll_now=True)
+            return REFRESH_SCHEDULED
+        return self._single_flight('refresh', self.refresh_data, ttl)
+    
     def standardize_day(self, day_name):
         """Standardize day names"""
         day_mapping = {
@@ -120,13 +570,14 @@ class OptimizedBBFSSystem:
         }
         return day_mapping.get(day_name.lower(), 'senin')
     
-    def get_current_working_date(self):
+    def get_current_working_date(self, snapshot=None):
         """Get current working date that skips non-working days based on actual data"""
-        if not self.data:
+        data = (snapshot or self._snapshot).data
+        if not data:
             return None, None
             
         # Get the latest data entry
-        latest_entry = self.data[-1]
+        latest_entry = data[-1]
         latest_date = latest_entry['date']
         latest_day = latest_entry['day']
         
@@ -165,238 +616,65 @@ class OptimizedBBFSSystem:
     
     def build_optimization_patterns(self):
         """Build patterns untuk optimasi BBFS"""
+        return self._write(OptimizedBBFSSystem._build_optimization_patterns)
+    
+    def _build_optimization_patterns(self):
         print("Membangun pola optimasi BBFS...")
         
-        # Analisis pattern berdasarkan day dan input
-        day_patterns = defaultdict(lambda: defaultdict(list))
-        input_patterns = defaultdict(list)
-        global_freq = Counter()
-        
-        for i in range(len(self.data) - 1):
-            current = self.data[i]
-            next_item = self.data[i + 1]
-            
-            day = current['day']
-            input_2d = current['last_2d']
-            next_2d = next_item['last_2d']
-            
-            # Day-input patterns
-            day_patterns[day][input_2d].append(next_2d)
-            
-            # Input patterns
-            input_patterns[input_2d].append(next_2d)
-            
-            # Global frequency
-            for digit in next_2d:
-                global_freq[digit] += 1
-        
-        self.optimization_cache = {
-            'day_patterns': dict(day_patterns),
-            'input_patterns': dict(input_patterns),
-            'global_freq': global_freq
-        }
+        # Tabel hitungan digit 8x100x10 (hari, input) dan 100x10 (input) + frekuensi global
+        self.optimization_cache = PatternModel.from_history(self.history, self.params)
+        # Materialisasi tabel prediksi lengkap sekali per versi data
+        self.optimization_cache.build_table()
         
         print(f"✓ Pola optimasi berhasil dibangun")
     
-    def generate_optimized_bbfs(self, input_2d, day, loss_context=0):
+    def generate_optimized_bbfs(self, input_2d, day, loss_context=0, snapshot=None):
         """Generate BBFS yang dioptimalkan untuk target maksimal 8 loss beruntun"""
-        candidates = set()
-        
-        # Strategy 1: Always include input digits (highest priority)
-        candidates.update(list(input_2d))
-        
-        # Strategy 2: Day-specific patterns
-        if day in self.optimization_cache.get('day_patterns', {}):
-            if input_2d in self.optimization_cache['day_patterns'][day]:
-                next_possibilities = self.optimization_cache['day_patterns'][day][input_2d]
-                
-                # Get all digits from next possibilities
-                next_digits = []
-                for next_2d in next_possibilities:
-                    next_digits.extend(list(next_2d))
-                
-                # Add top frequency digits
-                if next_digits:
-                    digit_freq = Counter(next_digits)
-                    top_digits = [d for d, _ in digit_freq.most_common(6)]
-                    candidates.update(top_digits)
-        
-        # Strategy 3: Input-specific patterns (regardless of day)
-        if input_2d in self.optimization_cache.get('input_patterns', {}):
-            next_possibilities = self.optimization_cache['input_patterns'][input_2d]
-            next_digits = []
-            for next_2d in next_possibilities:
-                next_digits.extend(list(next_2d))
-            
-            if next_digits:
-                digit_freq = Counter(next_digits)
-                top_digits = [d for d, _ in digit_freq.most_common(4)]
-                candidates.update(top_digits)
-        
-        # Strategy 4: Global high frequency digits
-        global_freq = self.optimization_cache.get('global_freq', Counter())
-        top_global = [d for d, _ in global_freq.most_common(8)]
-        candidates.update(top_global[:5])
-        
-        # Strategy 5: Anti-loss enhancement (untuk loss context > 3)
-        if loss_context > 3:
-            # Add complementary digits untuk break streak
-            complement_digits = []
-            for digit in input_2d:
-                comp = str((int(digit) + 5) % 10)
-                complement_digits.append(comp)
-            candidates.update(complement_digits)
-            
-            # Add sequential patterns
-            for digit in input_2d:
-                candidates.add(str((int(digit) + 1) % 10))
-                candidates.add(str((int(digit) + 2) % 10))
-        
-        # Convert to list and score (DETERMINISTIK - tidak ada randomness)
-        bbfs_candidates = sorted(list(candidates))  # Sort untuk konsistensi
-        
-        if len(bbfs_candidates) > 5:
-            # Score each digit secara deterministik
-            digit_scores = {}
-            for digit in bbfs_candidates:
-                score = 0
-                
-                # Input digits get highest score
-                if digit in input_2d:
-                    score += 1000
-                
-                # Global frequency score
-                if digit in global_freq:
-                    score += global_freq[digit]
-                
-                # Day-specific score
-                if day in self.optimization_cache.get('day_patterns', {}):
-                    if input_2d in self.optimization_cache['day_patterns'][day]:
-                        for next_2d in self.optimization_cache['day_patterns'][day][input_2d]:
-                            if digit in next_2d:
-                                score += 20
-                
-                # Loss context score
-                if loss_context > 0:
-                    if digit in str((int(input_2d[0]) + loss_context) % 10) + str((int(input_2d[1]) + loss_context) % 10):
-                        score += 50
-                
-                # Tie-breaker berdasarkan nilai digit (deterministik)
-                score += int(digit) * 0.1
-                
-                digit_scores[digit] = score
-            
-            # Sort by score dan digit value untuk hasil konsisten
-            sorted_digits = sorted(digit_scores.items(), key=lambda x: (x[1], x[0]), reverse=True)
-            bbfs = [digit for digit, _ in sorted_digits[:5]]
-        else:
-            bbfs = sorted(bbfs_candidates)  # Sort untuk konsistensi
-        
-        # Ensure exactly 5 digits
-        while len(bbfs) < 5:
-            for digit in "0123456789":
-                if digit not in bbfs:
-                    bbfs.append(digit)
-                    break
-        
-        return bbfs[:5]
+        snapshot = snapshot or self._snapshot
+        model = snapshot.optimization_cache
+        if not model:
+            # History < 2 draw: snapshot tidak punya model, pakai model kosong tanpa mengubah snapshot
+            model = PatternModel.from_history(snapshot.history, snapshot.params)
+        # Dilayani dari tabel materialisasi (hari x input x bucket loss), tanpa scoring per panggilan
+        return model.lookup(input_2d, day, loss_context)
     
     def test_comprehensive_performance(self):
         """Test performance dengan akurasi data yang ketat"""
+        return self._write(OptimizedBBFSSystem._test_comprehensive_performance)
+    
+    def _test_comprehensive_performance(self):
         print("Testing comprehensive performance...")
         
         if not self.optimization_cache:
-            self.build_optimization_patterns()
+            self._build_optimization_patterns()
         
         # Validasi data input terlebih dahulu
-        if len(self.data) < 2:
+        if len(self.history) < 2:
             print("Error: Data tidak cukup untuk analisis")
             return None
         
-        results = []
-        consecutive_losses = 0
-        max_consecutive = 0
-        total_wins = 0
-        total_tests = 0
-        loss_streaks = []
-        win_details = []
-        loss_details = []
-        
-        # Hitung dengan algoritma yang konsisten dan akurat
-        for i in range(len(self.data) - 1):
-            current = self.data[i]
-            next_item = self.data[i + 1]
-            
-            # Validasi data sebelum pemrosesan
-            if not current.get('last_2d') or not next_item.get('last_2d'):
-                continue
-            
-            if len(current['last_2d']) != 2 or len(next_item['last_2d']) != 2:
-                continue
-            
-            # Generate BBFS dengan metode deterministik
-            bbfs = self.generate_optimized_bbfs(
-                current['last_2d'], 
-                current['day'], 
-                consecutive_losses
-            )
-            
-            # Validasi BBFS hasil
-            if len(bbfs) != 5:
-                continue
-            
-            # Check win condition dengan validasi ketat
-            next_2d_digits = set(next_item['last_2d'])
-            bbfs_digits = set(bbfs)
-            
-            # Pastikan validasi benar: semua digit 2D harus ada di BBFS
-            is_win = next_2d_digits.issubset(bbfs_digits)
-            
-            total_tests += 1
-            
-            if is_win:
-                total_wins += 1
-                # Record loss streak before resetting
-                if consecutive_losses > 0:
-                    loss_streaks.append(consecutive_losses)
-                    consecutive_losses = 0
-                
-                win_details.append({
-                    'date': current['date'],
-                    'result': current['result'],
-                    'next': next_item['result'],
-                    'bbfs': ''.join(sorted(bbfs)),  # Sort untuk konsistensi
-                    'day': current['day'],
-                    'input_2d': current['last_2d'],
-                    'actual_2d': next_item['last_2d']
-                })
-            else:
-                consecutive_losses += 1
-                max_consecutive = max(max_consecutive, consecutive_losses)
-                
-                loss_details.append({
-                    'date': current['date'],
-                    'result': current['result'],
-                    'next': next_item['result'],
-                    'bbfs': ''.join(sorted(bbfs)),
-                    'day': current['day'],
-                    'loss_number': consecutive_losses,
-                    'input_2d': current['last_2d'],
-                    'actual_2d': next_item['last_2d']
-                })
-            
-            results.append({
-                'date': current['date'],
-                'input_2d': current['last_2d'],
-                'next_2d': next_item['last_2d'],
-                'bbfs': bbfs,
-                'is_win': is_win,
-                'consecutive_losses': consecutive_losses
-            })
-        
-        # Final streak calculation
-        if consecutive_losses > 0:
-            loss_streaks.append(consecutive_losses)
+        # Walk-forward: pola hanya dari draw sebelum setiap langkah (tanpa lookahead).
+        # Prefix-nya tidak pernah berubah, jadi draw baru cukup melanjutkan checkpoint ini
+        self.walk_forward = WalkForwardBacktest(self.params)
+        self.walk_forward.extend(self.history)
+        return self._update_performance()
+    
+    def _update_performance(self):
+        """Hitung ulang metrik in-sample dan gabungkan dengan checkpoint walk-forward"""
+        if not self.optimization_cache:
+            self._build_optimization_patterns()
+        
+        # Backtest vectorized: BBFS & 2D aktual sebagai bitmask 10-bit, loss_context tetap
+        # mengikuti streak berjalan. Pola in-sample ikut berubah untuk semua langkah setiap
+        # ada draw baru, jadi bagian ini selalu dihitung ulang (O(n) vectorized)
+        history = self.history
+        backtest = backtest_history(self.optimization_cache, history)
+        self.backtest = backtest
+        self.in_sample = BacktestCheckpoint.from_result(backtest)
+        total_tests = self.in_sample.total_tests
+        total_wins = self.in_sample.total_wins
+        max_consecutive = self.in_sample.max_consecutive_loss
+        loss_streaks = self.in_sample.loss_streaks
         
         # Validasi perhitungan akhir
         if total_tests == 0:
@@ -409,6 +687,14 @@ class OptimizedBBFSSystem:
         print(f"VALIDASI: Total Tests={total_tests}, Total Wins={total_wins}, Win Rate={win_rate:.1f}%")
         print(f"VALIDASI: Max Loss={max_consecutive}, Loss Streaks Count={len(loss_streaks)}")
         
+        walk_forward = self.walk_forward.summary()
+        print(f"VALIDASI (walk-forward): Win Rate={walk_forward['win_rate']:.1f}%, Max Loss={walk_forward['max_consecutive_loss']}")
+        
+        # Detail hanya dimaterialisasi untuk ekor yang ditampilkan
+        win_steps = np.flatnonzero(backtest.win)[-100:]
+        loss_steps = np.flatnonzero(~backtest.win)[-100:]
+        result_steps = range(max(total_tests - 100, 0), total_tests)
+        
         # Simpan hasil dengan validasi ketat
         self.performance_data = {
             'total_tests': total_tests,
@@ -419,27 +705,13 @@ class OptimizedBBFSSystem:
             'max_consecutive_loss': max_consecutive,
             'loss_streaks': loss_streaks,
             'meets_target': max_consecutive <= 10,
-            'win_details': win_details[-100:],  # Batasi untuk performa
-            'loss_details': loss_details[-100:],
-            'results': results[-100:],
+            'win_details': [_step_detail(self._snapshot, i) for i in win_steps],  # Batasi untuk performa
+            'loss_details': [_step_detail(self._snapshot, i) for i in loss_steps],
+            'results': [_step_result(self._snapshot, i) for i in result_steps],
+            'walk_forward': walk_forward,
             'last_updated': datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
-            'data_range': f"{self.data[0]['date'].strftime('%Y-%m-%d')} - {self.data[-1]['date'].strftime('%Y-%m-%d')}",
-            'total_data_records': len(self.data)
-        }
-        
-        print(f"Performance: Win Rate {win_rate:.1f}%, Max Loss {max_consecutive}")
-        return self.performance_data
-        
-        self.performance_data = {
-            'total_tests': total_tests,
-            'total_wins': total_wins,
-            'win_rate': win_rate,
-            'max_consecutive_loss': max_consecutive,
-            'loss_streaks': loss_streaks,
-            'meets_target': max_consecutive <= 8,
-            'win_details': win_details[-50:],
-            'loss_details': loss_details[-50:],
-            'results': results
+            'data_range': f"{history[0]['date'].strftime('%Y-%m-%d')} - {history[-1]['date'].strftime('%Y-%m-%d')}",
+            'total_data_records': len(history)
         }
         
         print(f"Performance: Win Rate {win_rate:.1f}%, Max Loss {max_consecutive}")
@@ -448,93 +720,85 @@ class OptimizedBBFSSystem:
     def run_performance_test(self, force_refresh=False):
         """Run performance test dan simpan hasil dengan caching konsisten"""
         # Force refresh or if no cached data, run new test
-        if force_refresh or not hasattr(self, 'performance_data') or not self.performance_data:
-            result = self.test_comprehensive_performance()
-            if result:
-                print(f"Performance: Win Rate {self.performance_data['win_rate']:.1f}%, Max Loss {self.performance_data['max_consecutive_loss']}")
-                return True
-            else:
-                print("Performance test gagal")
-                return False
+        if force_refresh or not self.performance_data:
+            return self._write(OptimizedBBFSSystem._run_performance_test)
         
         # Return cached data if available
         return True
     
-    def get_current_loss_streak_analysis(self, limit=10):
+    def _run_performance_test(self):
+        result = self._test_comprehensive_performance()
+        if result:
+            print(f"Performance: Win Rate {self.performance_data['win_rate']:.1f}%, Max Loss {self.performance_data['max_consecutive_loss']}")
+            return True
+        else:
+            print("Performance test gagal")
+            return False
+    
+    def get_current_loss_streak_analysis(self, limit=10, snapshot=None):
         """Analisis current loss streak REAL-TIME yang akurat"""
-        if not self.data or len(self.data) < 2:
+        snapshot = snapshot or self._snapshot
+        data = snapshot.history
+        backtest = snapshot.backtest
+        if backtest is None or len(data) < 2:
             return 0, []
         
-        # Pastikan menggunakan optimization cache yang sudah dibangun
-        if not self.optimization_cache:
-            self.build_optimization_patterns()
+        # Streak aktif diambil langsung dari backtest (loss_context sama dengan backtest)
+        current_streak = int(backtest.streak[-1])
         
-        current_streak = 0
+        # Detail untuk loss terakhir di dalam window, urutan kronologis
+        total_tests = backtest.total_tests
+        first_step = total_tests - min(current_streak, limit - 1)
         streak_details = []
-        
-        # Analisis dari data terbaru mundur dengan chronological order yang benar
-        # Data sudah di-sort ascending, jadi ambil yang terakhir
-        recent_data = self.data[-limit:] if len(self.data) >= limit else self.data
-        
-        # Test dari data terbaru ke belakang untuk mencari current active streak
-        for i in range(len(recent_data) - 1, 0, -1):  # Mundur dari yang terbaru
-            prev_item = recent_data[i - 1]  # Data sebelumnya (input untuk prediksi)
-            current = recent_data[i]        # Data hasil (untuk validasi)
-            
-            # Generate BBFS berdasarkan data sebelumnya
-            bbfs = self.generate_optimized_bbfs(prev_item['last_2d'], prev_item['day'], 0)
-            current_2d_digits = set(current['last_2d'])
-            bbfs_digits = set(bbfs)
-            
-            # Check apakah BBFS berhasil cover result
-            is_win = current_2d_digits.issubset(bbfs_digits)
-            
-            if not is_win:
-                current_streak += 1
-                streak_details.insert(0, {  # Insert di awal untuk urutan chronological
-                    'date': prev_item['date'],
-                    'input_result': prev_item['result'],
-                    'actual_result': current['result'],
-                    'input_2d': prev_item['last_2d'],
-                    'actual_2d': current['last_2d'],
-                    'bbfs_used': ''.join(bbfs),
-                    'day': prev_item['day'],
-                    'loss_number': current_streak
-                })
-            else:
-                # Ketemu win, stop counting
-                break
+        for i in range(first_step, total_tests):
+            prev_item = data[i]      # Data sebelumnya (input untuk prediksi)
+            current = data[i + 1]    # Data hasil (untuk validasi)
+            streak_details.append({
+                'date': prev_item['date'],
+                'input_result': prev_item['result'],
+                'actual_result': current['result'],
+                'input_2d': prev_item['last_2d'],
+                'actual_2d': current['last_2d'],
+                'bbfs_used': ''.join(_step_bbfs(snapshot, i)),
+                'day': prev_item['day'],
+                'loss_number': int(backtest.streak[i])
+            })
         
         return current_streak, streak_details
     
-    def get_performance_summary(self):
+    def get_performance_summary(self, snapshot=None):
         """Get performance summary"""
-        if not hasattr(self, 'performance_data') or not self.performance_data:
+        performance_data = (snapshot or self._snapshot).performance_data
+        if not performance_data:
             return None
         
         return {
-            'total_tests': self.performance_data['total_tests'],
-            'wins': self.performance_data['total_wins'],
-            'win_rate': self.performance_data['win_rate'],
-            'max_consecutive_loss': self.performance_data['max_consecutive_loss'],
-            'meets_target': self.performance_data['meets_target']
+            'total_tests': performance_data['total_tests'],
+            'wins': performance_data['total_wins'],
+            'win_rate': performance_data['win_rate'],
+            'max_consecutive_loss': performance_data['max_consecutive_loss'],
+            'meets_target': performance_data['meets_target'],
+            'walk_forward': performance_data.get('walk_forward')
         }
     
-    def get_consecutive_loss_breakdown(self):
+    def get_consecutive_loss_breakdown(self, snapshot=None):
         """Get breakdown of consecutive losses - shows ALL streaks including 20x+"""
-        if not hasattr(self, 'performance_data') or not self.performance_data or not self.performance_data.get('loss_streaks'):
+        snapshot = snapshot or self._snapshot
+        performance_data = snapshot.performance_data
+        if not performance_data or not performance_data.get('loss_streaks'):
             return {}
         
-        loss_streaks = self.performance_data['loss_streaks']
+        loss_streaks = performance_data['loss_streaks']
         if not loss_streaks:
             return {}
         
-        streak_counts = Counter(loss_streaks)
+        # Hitungan per panjang streak sudah dipelihara checkpoint in-sample
+        streak_counts = snapshot.in_sample.streak_counts if snapshot.in_sample else Counter(loss_streaks)
         total_streaks = len(loss_streaks)
         
         breakdown = {}
         # Sort by streak length to show in order (1x, 2x, 3x, ... up to max)
-        max_streak = max(loss_streaks) if loss_streaks else 0
+        max_streak = performance_data['max_consecutive_loss']
         
         for streak_len in sorted(streak_counts.keys()):
             count = streak_counts[streak_len]
@@ -563,46 +827,42 @@ class OptimizedBBFSSystem:
         breakdown['_summary'] = {
             'total_streaks': total_streaks,
             'max_streak': max_streak,
-            'avg_streak': sum(loss_streaks) / len(loss_streaks) if loss_streaks else 0
+            'avg_streak': performance_data['total_losses'] / total_streaks if total_streaks else 0
         }
         
         return breakdown
     
 
     
-    def get_latest_results(self, limit=10):
+    def get_latest_results(self, limit=10, snapshot=None):
         """Get latest results in chronological order (newest first)"""
-        if not self.data:
+        data = (snapshot or self._snapshot).history
+        if not data:
             return []
         
         # Return data terbaru dalam urutan terbaru ke lama
-        return list(reversed(self.data[-limit:]))
+        return list(reversed(data[-limit:]))
     
-    def get_real_time_analysis(self, limit=8):
+    def get_real_time_analysis(self, limit=8, snapshot=None):
         """Analisis real-time untuk menampilkan win/loss yang akurat"""
-        if not self.data or len(self.data) < 2:
+        snapshot = snapshot or self._snapshot
+        data = snapshot.history
+        backtest = snapshot.backtest
+        if backtest is None or len(data) < 2:
             return []
         
-        # Pastikan optimization cache tersedia
-        if not self.optimization_cache:
-            self.build_optimization_patterns()
-        
+        # Slice kolom backtest, tanpa generate BBFS ulang
         analysis_results = []
-        recent_data = self.data[-limit-1:] if len(self.data) > limit else self.data
         
         # Analisis dari data kedua terakhir sampai yang terbaru
-        for i in range(len(recent_data) - 1):
-            current = recent_data[i]      # Input untuk prediksi
-            next_item = recent_data[i + 1] # Hasil aktual
+        for i in range(max(backtest.total_tests - limit, 0), backtest.total_tests):
+            current = data[i]          # Input untuk prediksi
+            next_item = data[i + 1]    # Hasil aktual
             
-            # Generate BBFS berdasarkan current data
-            bbfs = self.generate_optimized_bbfs(current['last_2d'], current['day'], 0)
+            bbfs = _step_bbfs(snapshot, i)
             next_2d_digits = set(next_item['last_2d'])
             bbfs_digits = set(bbfs)
             
-            # Validasi win/loss
-            is_win = next_2d_digits.issubset(bbfs_digits)
-            
             analysis_results.append({
                 'date': current['date'],
                 'input_result': current['result'],
@@ -612,34 +872,55 @@ class OptimizedBBFSSystem:
                 'bbfs_generated': bbfs,
                 'bbfs_string': ''.join(bbfs),
                 'day': current['day'],
-                'is_win': is_win,
-                'covered_digits': list(next_2d_digits & bbfs_digits),
-                'missing_digits': list(next_2d_digits - bbfs_digits)
+                'is_win': bool(backtest.win[i]),
+                'covered_digits': sorted(next_2d_digits & bbfs_digits),
+                'missing_digits': sorted(next_2d_digits - bbfs_digits)
             })
         
         # Return dalam urutan terbaru ke lama
         return list(reversed(analysis_results))
     
-    def get_data_info(self):
+    def get_data_info(self, snapshot=None):
         """Get data information"""
-        if not self.data:
+        snapshot = snapshot or self._snapshot
+        data = snapshot.data
+        if not data:
             return None
         
         return {
-            'total_records': len(self.data),
+            'total_records': len(data),
             'date_range': {
-                'start': self.data[0]['date'].strftime('%Y-%m-%d'),
-                'end': self.data[-1]['date'].strftime('%Y-%m-%d')
+                'start': data[0]['date'].strftime('%Y-%m-%d'),
+                'end': data[-1]['date'].strftime('%Y-%m-%d')
             },
-            'last_updated': self.last_updated.strftime('%Y-%m-%d %H:%M:%S') if self.last_updated else None
+            'last_updated': snapshot.last_updated.strftime('%Y-%m-%d %H:%M:%S') if snapshot.last_updated else None,
+            'version': snapshot.version,
+            'date_window': [date.fromordinal(bound).isoformat() if bound is not None else None
+                            for bound in snapshot.date_range],
+            'window_records': len(snapshot.history)
         }
 
-# Singleton instance
-_optimized_system = None
+def _new_system(url):
+    return OptimizedBBFSSystem(url, snapshot_store=get_snapshot_store())
+
+def _create_system(url):
+    system = _new_system(url)
+    # Sajikan snapshot lokal segera (model & backtest ikut disiapkan), lalu scheduler
+    # langsung rekonsiliasi dengan sumber dan selanjutnya poll mengikuti jadwal draw
+    loaded = system.load_snapshot()
+    system.start_scheduler(poll_now=loaded)
+    return system
+
+# Satu sistem per URL sumber, beberapa market tetap hangat sekaligus
+_registry = SystemRegistry(_create_system)
 
 def get_optimized_system(data_url=None):
     """Get system instance with configurable URL"""
-    global _optimized_system
-    if _optimized_system is None or (data_url and data_url != _optimized_system.url):
-        _optimized_system = OptimizedBBFSSystem(data_url)
-    return _optimized_system
\ No newline at end of file
+    return _registry.get(data_url or DEFAULT_URL)
+
+def register_snapshot(snapshot):
+    """Pasang snapshot siap pakai ke sistem registry untuk URL-nya (dibuat bila belum ada)"""
+    system = _registry.get(snapshot.url, factory=_new_system)
+    system.install_snapshot(snapshot)
+    system.start_scheduler()
+    return system
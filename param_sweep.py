@@ -0,0 +1,209 @@
+#!/usr/bin/env python3
+"""
+Sweep knob generate BBFS (BBFSParams) dengan grid atau random search paralel.
+
+Hitungan pola tidak bergantung pada params, jadi model dibangun sekali; setiap params hanya
+membangun tabel BBFS (vectorized) dan menjalankan backtest bitmask. Model dibangun dari prefix
+history (train) dan dinilai pada sisa history (holdout) yang tidak pernah dilihatnya; metrik
+in-sample pada train dilaporkan berdampingan. Pareto front win rate vs max kalah beruntun
+dihitung dari metrik holdout, karena metrik in-sample menghadiahi overfitting.
+
+    python -m param_sweep --draws 20000 --random 5000 --holdout 0.3
+    python -m param_sweep --url http://178.128.121.191/ --grid day_top=4,6,8 --grid loss_threshold=2,3,5
+"""
+
+import argparse
+import itertools
+import random
+from concurrent.futures import ProcessPoolExecutor
+
+from bbfs_backtest import run_bitmask_backtest
+from bbfs_model import DEFAULT_PARAMS, BBFSParams, PatternModel
+
+# Nilai yang dicoba per knob pada random search (nilai default selalu termasuk)
+SEARCH_SPACE = {
+    'day_top': range(0, 11),
+    'input_top': range(0, 11),
+    'global_top': range(0, 11),
+    'input_score': (0, 10, 50, 100, 200, 500, 1000, 5000),
+    'presence_weight': (0, 1, 2, 5, 10, 20, 50, 100),
+    'shift_score': (0, 10, 20, 50, 100, 200, 500),
+    'loss_threshold': range(0, 11),
+}
+# Jumlah params per task process pool
+CHUNK_SIZE = 64
+# Porsi akhir history yang disisihkan untuk penilaian out-of-sample
+DEFAULT_HOLDOUT = 0.3
+
+
+def param_grid(**choices):
+    """Semua kombinasi nilai choices (knob -> daftar nilai); knob lain memakai default"""
+    fields = list(choices)
+    return [DEFAULT_PARAMS._replace(**dict(zip(fields, values)))
+            for values in itertools.product(*(choices[field] for field in fields))]
+
+
+def random_params(count, seed=0, space=SEARCH_SPACE):
+    """count params unik yang diambil acak (reproducible) dari space, diawali params default"""
+    rng = random.Random(seed)
+    params = {DEFAULT_PARAMS: None}
+    attempts = 0
+    while len(params) < count and attempts < count * 20:
+        params[BBFSParams(**{field: rng.choice(values) for field, values in space.items()})] = None
+        attempts += 1
+    return list(params)[:count]
+
+
+def split_history(history, holdout=DEFAULT_HOLDOUT):
+    """(train, {nama metrik: kolom backtest}) untuk history
+
+    Kolom backtest = (kode hari, input 2D, 2D berikutnya). 'in_sample' menilai transisi di
+    dalam train; 'holdout' menilai langkah dari draw train terakhir sampai akhir history, yang
+    target-nya tidak pernah masuk hitungan model. holdout=0: hanya in-sample di seluruh history.
+    """
+    split = len(history) - int(len(history) * holdout)
+    if split < 2 or (holdout and split >= len(history)):
+        raise ValueError(f"History {len(history)} draw terlalu pendek untuk holdout {holdout}")
+    train = history[:split]
+    columns = {'in_sample': (train.day_codes[:-1], train.last_2d[:-1], train.last_2d[1:])}
+    if split < len(history):
+        columns['holdout'] = (history.day_codes[split - 1:-1], history.last_2d[split - 1:-1],
+                              history.last_2d[split:])
+    return train, columns
+
+
+def evaluate_params(model, columns, params):
+    """Backtest bitmask satu params untuk setiap set kolom (lihat split_history)"""
+    masks = model.masks_for(params)
+    evaluation = {'params': params}
+    for name, backtest_columns in columns.items():
+        result = run_bitmask_backtest(masks, *backtest_columns, params.loss_threshold)
+        total_tests = result.total_tests
+        total_wins = result.total_wins
+        evaluation[name] = {
+            'total_tests': total_tests,
+            'total_wins': total_wins,
+            'win_rate': round(total_wins / total_tests * 100, 2) if total_tests else 0,
+            'max_consecutive_loss': result.max_consecutive_loss,
+        }
+    return evaluation
+
+
+# (model, columns) per worker process, dikirim sekali saat worker dibuat
+_worker_state = None
+
+def _init_worker(model, columns):
+    global _worker_state
+    _worker_state = (model, columns)
+
+def _evaluate_chunk(chunk):
+    return [evaluate_params(*_worker_state, params) for params in chunk]
+
+
+def sweep(history, params_list, processes=None, holdout=DEFAULT_HOLDOUT, model=None):
+    """Evaluasi semua params pada history, hasil sesuai urutan params_list (duplikat dibuang)
+
+    Setiap hasil berisi metrik 'in_sample' dan (bila holdout > 0) 'holdout'. model: PatternModel
+    yang sudah dibangun dari train (history[:split], lihat split_history); params-nya tidak
+    berpengaruh karena hanya hitungannya yang dipakai.
+    """
+    train, columns = split_history(history, holdout)
+    if model is None:
+        model = PatternModel.from_history(train)
+    params_list = list(dict.fromkeys(params_list))
+    chunks = [params_list[i:i + CHUNK_SIZE] for i in range(0, len(params_list), CHUNK_SIZE)]
+
+    if processes == 1 or len(chunks) <= 1:
+        return [evaluate_params(model, columns, params) for params in params_list]
+    with ProcessPoolExecutor(max_workers=processes, initializer=_init_worker,
+                             initargs=(model, columns)) as executor:
+        return [result for chunk in executor.map(_evaluate_chunk, chunks) for result in chunk]
+
+
+def sweep_snapshot(snapshot, params_list, processes=None, holdout=DEFAULT_HOLDOUT):
+    """sweep pada history (rentang analisis) snapshot OptimizedBBFSSystem
+
+    Model snapshot dibangun dari seluruh rentang, jadi hanya dipakai ulang untuk holdout=0
+    (in-sample saja); dengan holdout model dibangun dari prefix train.
+    """
+    model = None
+    if not holdout:
+        model = snapshot.optimization_cache or None
+    return sweep(snapshot.history, params_list, processes, holdout, model)
+
+
+def pareto_front(results, metric=None):
+    """Hasil yang tidak didominasi pada metric ('holdout' bila ada, selain itu 'in_sample')
+
+    Terurut dari max kalah beruntun terkecil. Satu hasil didominasi bila ada hasil lain dengan
+    max kalah beruntun <= dan win rate >= (salah satunya lebih baik).
+    """
+    if metric is None:
+        metric = 'holdout' if results and 'holdout' in results[0] else 'in_sample'
+    front = []
+    best_win_rate = None
+    for result in sorted(results, key=lambda r: (r[metric]['max_consecutive_loss'], -r[metric]['win_rate'])):
+        if best_win_rate is None or result[metric]['win_rate'] > best_win_rate:
+            front.append(result)
+            best_win_rate = result[metric]['win_rate']
+    return front
+
+
+def parse_grid(specs):
+    """['day_top=4,6,8', ...] -> {'day_top': [4, 6, 8], ...}"""
+    choices = {}
+    for spec in specs:
+        field, _, values = spec.partition('=')
+        if field not in BBFSParams._fields:
+            raise SystemExit(f"Knob tidak dikenal: {field} (pilihan: {', '.join(BBFSParams._fields)})")
+        choices[field] = [int(value) for value in values.split(',')]
+    return choices
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    source = parser.add_mutually_exclusive_group()
+    source.add_argument('--url', help="Fetch history dari sumber (default: history sintetis)")
+    source.add_argument('--draws', type=int, default=20000, help="Jumlah draw history sintetis")
+    parser.add_argument('--grid', action='append', default=[], metavar='KNOB=V1,V2',
+                        help="Grid search untuk knob ini (boleh diulang); tanpa --grid: random search")
+    parser.add_argument('--random', type=int, default=2000, help="Jumlah params random search")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--processes', type=int, default=None)
+    parser.add_argument('--holdout', type=float, default=DEFAULT_HOLDOUT,
+                        help="Porsi akhir history untuk penilaian out-of-sample (0 = hanya in-sample)")
+    args = parser.parse_args()
+
+    if args.url:
+        from optimized_bbfs_system import OptimizedBBFSSystem
+        system = OptimizedBBFSSystem(args.url)
+        if not system.fetch_complete_data():
+            raise SystemExit(f"Gagal memuat data dari {args.url}")
+        history = system.history
+    else:
+        from benchmarks.synthetic import synthetic_history
+        history = synthetic_history(args.draws, args.seed)
+
+    params_list = param_grid(**parse_grid(args.grid)) if args.grid else random_params(args.random, args.seed)
+    print(f"Sweep {len(params_list)} params pada {len(history)} draw (holdout {args.holdout:.0%})...")
+    results = sweep(history, params_list, args.processes, args.holdout)
+
+    metrics = [metric for metric in ('holdout', 'in_sample') if metric in results[0]]
+    print('\nPareto front ' + metrics[0] + ' | ' +
+          ' | '.join(f"{metric}: max loss, win rate" for metric in metrics) + ' | params')
+
+    def describe(result):
+        scores = '  '.join(f"{result[metric]['max_consecutive_loss']:>4} {result[metric]['win_rate']:>6.2f}%"
+                           for metric in metrics)
+        params = ', '.join(f"{field}={value}" for field, value in result['params']._asdict().items())
+        return f"{scores}  {params}"
+
+    for result in pareto_front(results, metrics[0]):
+        print(describe(result))
+    default = next((result for result in results if result['params'] == DEFAULT_PARAMS), None)
+    if default:
+        print(f"\nDefault: {describe(default)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,101 @@
+import threading
+from datetime import date, datetime, timedelta
+
+# Hari tanpa hasil draw (Sabtu), sama seperti get_current_working_date
+NO_DRAW_WEEKDAYS = (5,)
+
+
+def is_draw_day(day):
+    return day.weekday() not in NO_DRAW_WEEKDAYS
+
+
+def latest_draw_date(day):
+    """Tanggal draw terakhir pada atau sebelum day"""
+    while not is_draw_day(day):
+        day -= timedelta(days=1)
+    return day
+
+
+def next_draw_date(day):
+    """Tanggal draw pertama setelah day"""
+    day += timedelta(days=1)
+    while not is_draw_day(day):
+        day += timedelta(days=1)
+    return day
+
+
+class RefreshScheduler:
+    """Thread background yang mem-poll sumber mengikuti jadwal draw
+
+    Setiap poll memanggil system.refresh_data(), yang membangun history, model dan backtest baru
+    di samping lalu mempublikasikannya dengan satu swap referensi. Request user tidak pernah
+    menunggu network maupun melihat state setengah jadi.
+    """
+
+    def __init__(self, system, poll_interval=300, draw_offset=timedelta(0)):
+        self.system = system
+        # Interval poll selama hasil draw terbaru belum ada di sumber
+        self.poll_interval = poll_interval
+        # Jarak dari tengah malam sampai hasil draw paling awal bisa muncul
+        self.draw_offset = draw_offset
+        self.last_poll = None
+        self.last_result = None
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._thread = None
+        # start() dari beberapa sesi sekaligus tetap menghasilkan satu thread
+        self._lock = threading.Lock()
+
+    def seconds_until_next_poll(self, now=None):
+        """Segera (per poll_interval) bila hasil draw ditunggu, selain itu tunggu jadwal draw berikutnya"""
+        now = now or datetime.now()
+        data = self.system.data
+        if not data:
+            return self.poll_interval
+
+        due = latest_draw_date((now - self.draw_offset).date())
+        if date.fromordinal(int(data.ordinals[-1])) < due:
+            return self.poll_interval
+
+        next_poll = datetime.combine(next_draw_date(due), datetime.min.time()) + self.draw_offset
+        return max((next_poll - now).total_seconds(), 0)
+
+    def poll(self):
+        """Jalankan satu refresh sekarang (di thread pemanggil)"""
+        self.last_result = self.system.refresh_data()
+        self.last_poll = datetime.now()
+        return self.last_result
+
+    def trigger(self):
+        """Minta poll secepatnya tanpa menunggu hasilnya"""
+        self._wake.set()
+
+    def start(self, poll_now=False):
+        """Jalankan thread bila belum berjalan; poll_now juga memicu poll pada thread yang sudah ada"""
+        with self._lock:
+            if poll_now:
+                self._wake.set()
+            if self.is_running():
+                return self
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name="bbfs-refresh", daemon=True)
+            self._thread.start()
+            return self
+
+    def stop(self):
+        self._stop.set()
+        self._wake.set()
+
+    def is_running(self):
+        return self._thread is not None and self._thread.is_alive()
+
+    def _run(self):
+        while not self._stop.is_set():
+            self._wake.wait(self.seconds_until_next_poll())
+            self._wake.clear()
+            if self._stop.is_set():
+                break
+            try:
+                self.poll()
+            except Exception as e:
+                print(f"Error refresh terjadwal: {e}")
@@ -0,0 +1,125 @@
+import os
+import re
+from datetime import date
+
+from draw_history import DAY_NAMES, DrawHistory
+
+# Satu pattern untuk semua format: title="Friday=2021-01-01=2030" maupun title="Friday=2025-06-20"
+CELL_PATTERN = re.compile(rb'<td title="([^"]+)">(\d{4})</td>')
+
+# Nama hari (Indonesia/Inggris, lowercase bytes) -> kode hari DrawHistory
+DAY_CODE_BY_NAME = {
+    b'senin': 0, b'selasa': 1, b'rabu': 2, b'kamis': 3, b'jumat': 4, b'sabtu': 5, b'minggu': 6,
+    b'monday': 0, b'tuesday': 1, b'wednesday': 2, b'thursday': 3, b'friday': 4, b'saturday': 5, b'sunday': 6,
+    b'mon': 0, b'tue': 1, b'wed': 2, b'thu': 3, b'fri': 4, b'sat': 5, b'sun': 6
+}
+
+DEFAULT_CHUNK_SIZE = 64 * 1024
+
+# Window tahun yang diterima loader; tanpa batas atas bawaan agar draw tahun baru tidak terbuang
+DEFAULT_MIN_YEAR = int(os.getenv('BBFS_MIN_YEAR', '2020'))
+DEFAULT_MAX_YEAR = int(os.getenv('BBFS_MAX_YEAR', '9999'))
+
+
+class StreamingResultParser:
+    """Parser single-pass untuk cell <td title=...>NNNN</td> yang dibaca per chunk"""
+
+    def __init__(self, history=None, min_year=DEFAULT_MIN_YEAR, max_year=DEFAULT_MAX_YEAR, default_day=0):
+        self.history = history if history is not None else DrawHistory(DAY_NAMES)
+        self.min_year = min_year
+        self.max_year = max_year
+        # Kode hari untuk nama yang tidak dikenal; None = lewati baris
+        self.default_day = default_day
+        self.cells_seen = 0
+        self.bytes_seen = 0
+        self._carry = b''
+        self._sorted = True
+        self._last_ordinal = -1
+
+    def feed(self, chunk):
+        """Proses satu chunk bytes dan tambahkan record yang lengkap ke history"""
+        if not chunk:
+            return
+        self.bytes_seen += len(chunk)
+        buf = self._carry + chunk if self._carry else chunk
+
+        ordinals = []
+        day_codes = []
+        results = []
+        last_end = 0
+        for match in CELL_PATTERN.finditer(buf):
+            last_end = match.end()
+            self.cells_seen += 1
+            record = self._parse_title(match.group(1))
+            if record is not None:
+                ordinals.append(record[0])
+                day_codes.append(record[1])
+                results.append(int(match.group(2)))
+
+        # Simpan sisa buffer yang mungkin berisi cell terpotong di batas chunk
+        cut = buf.rfind(b'<td', last_end)
+        if cut == -1:
+            cut = max(last_end, len(buf) - 3)
+        self._carry = buf[cut:]
+
+        if results:
+            if ordinals[0] < self._last_ordinal or any(a > b for a, b in zip(ordinals, ordinals[1:])):
+                self._sorted = False
+            self._last_ordinal = max(self._last_ordinal, ordinals[-1])
+            self.history.extend(DrawHistory.from_arrays(ordinals, day_codes, results, self.history.day_names))
+
+    def _parse_title(self, title):
+        parts = title.split(b'=')
+        if len(parts) < 2:
+            return None
+        date_str = parts[1].strip()
+        # Tanggal ISO YYYY-MM-DD tanpa strptime
+        if len(date_str) != 10 or date_str[4] != 45 or date_str[7] != 45:
+            return None
+        try:
+            year = int(date_str[:4])
+            if not self.min_year <= year <= self.max_year:
+                return None
+            ordinal = date(year, int(date_str[5:7]), int(date_str[8:10])).toordinal()
+        except ValueError:
+            return None
+
+        day_code = DAY_CODE_BY_NAME.get(parts[0].strip().lower(), self.default_day)
+        if day_code is None:
+            return None
+        return ordinal, day_code
+
+    def close(self):
+        """Selesaikan parsing dan kembalikan history yang terurut berdasarkan tanggal"""
+        self._carry = b''
+        if not self._sorted:
+            self.history.sort()
+            self._sorted = True
+        return self.history
+
+
+def parse_stream(chunks, **kwargs):
+    """Parse iterable chunk bytes (mis. response.iter_content) menjadi DrawHistory"""
+    parser = StreamingResultParser(**kwargs)
+    for chunk in chunks:
+        parser.feed(chunk)
+    return parser.close()
+
+
+def parse_response(response, chunk_size=DEFAULT_CHUNK_SIZE, **kwargs):
+    """Parse response requests (stream=True) tanpa menyimpan seluruh body di memory
+
+    Response selalu ditutup, juga bila parse gagal di tengah body.
+    """
+    parser = StreamingResultParser(**kwargs)
+    with response:
+        for chunk in response.iter_content(chunk_size=chunk_size):
+            parser.feed(chunk)
+    return parser, parser.close()
+
+
+def parse_content(content, **kwargs):
+    """Parse seluruh konten HTML (str atau bytes) sekaligus"""
+    if isinstance(content, str):
+        content = content.encode('utf-8')
+    return parse_stream([content], **kwargs)
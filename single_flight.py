@@ -0,0 +1,54 @@
+import threading
+import time
+
+
+class _Call:
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+        self.finished_at = None
+
+
+class SingleFlight:
+    """Satu eksekusi per key untuk seluruh proses
+
+    Pemanggil bersamaan untuk key yang sama menunggu eksekusi yang sedang berjalan dan berbagi
+    hasilnya. Hasil (termasuk gagal) dipakai ulang selama ttl detik agar lonjakan request tidak
+    menjadi lonjakan download ke sumber; forget membuang hasil yang tidak boleh dipakai ulang.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls = {}
+
+    def do(self, key, func, ttl=0):
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None or (
+                call.done.is_set() and time.monotonic() - call.finished_at >= ttl
+            )
+            if leader:
+                call = self._calls[key] = _Call()
+
+        if leader:
+            try:
+                call.result = func()
+            except Exception as e:
+                call.error = e
+            finally:
+                call.finished_at = time.monotonic()
+                call.done.set()
+        else:
+            call.done.wait()
+
+        if call.error is not None:
+            raise call.error
+        return call.result
+
+    def forget(self, key):
+        """Buang hasil tersimpan sehingga pemanggil berikutnya mengeksekusi ulang"""
+        with self._lock:
+            call = self._calls.get(key)
+            if call is not None and call.done.is_set():
+                del self._calls[key]
@@ -0,0 +1,277 @@
+#!/usr/bin/env python3
+"""
+Record/replay halaman sumber untuk pengembangan dan benchmark tanpa network.
+
+Rekam respons sumber apa adanya (body + header validator) lewat fetch_complete_data:
+    python -m source_replay record http://178.128.121.191/ --out recordings
+Sajikan kembali dari server lokal, dengan latency, throttling dan kegagalan buatan:
+    python -m source_replay serve recordings --port 8765 --latency 0.5 --bandwidth 200000 --failure-rate 0.2
+"""
+
+import argparse
+import json
+import os
+import random
+import re
+import threading
+import time
+from datetime import datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlsplit
+
+CHUNK_SIZE = 16 * 1024
+# Header sumber yang disimpan dan diputar ulang
+KEPT_HEADERS = ('Content-Type', 'ETag', 'Last-Modified')
+
+
+def recording_name(url):
+    """Nama file rekaman untuk url, mis. http://178.128.121.191/ -> 178.128.121.191"""
+    parts = urlsplit(url)
+    return re.sub(r'[^A-Za-z0-9.-]+', '_', parts.netloc + parts.path).strip('_') or 'index'
+
+
+class Recorder:
+    """Simpan body respons sumber ke directory/<nama>.html dan metadatanya ke <nama>.json
+
+    Body respons stream disalin sambil dibaca (iter_content), jadi parse streaming tetap berjalan
+    seperti biasa; body yang sudah dibaca penuh (stream=False) langsung ditulis. File baru
+    dipindahkan ke nama akhirnya setelah body lengkap.
+    """
+
+    def __init__(self, directory):
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+
+    def capture(self, url, response):
+        if response.status_code != 200:
+            return response
+        name = recording_name(url)
+        path = os.path.join(self.directory, name + '.html')
+        meta = {
+            'url': url,
+            'status': response.status_code,
+            'headers': {key: response.headers[key] for key in KEPT_HEADERS if key in response.headers},
+            'recorded_at': datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+        }
+        if response._content_consumed:
+            # stream=False: requests sudah membaca body, iter_content tidak akan dipanggil lagi
+            with open(path + '.part', 'wb') as f:
+                f.write(response.content)
+            self._finish(name, path, meta)
+            return response
+
+        iter_content = response.iter_content
+
+        def tee(chunk_size=1, decode_unicode=False):
+            with open(path + '.part', 'wb') as f:
+                for chunk in iter_content(chunk_size=chunk_size):
+                    f.write(chunk)
+                    yield chunk
+            self._finish(name, path, meta)
+
+        response.iter_content = tee
+        return response
+
+    def _finish(self, name, path, meta):
+        os.replace(path + '.part', path)
+        with open(os.path.join(self.directory, name + '.json'), 'w') as f:
+            json.dump(meta, f, indent=2)
+        print(f"✓ Respons direkam ke {path}")
+
+
+def load_recordings(directory):
+    """{nama: (path body, metadata)} untuk semua file .html di directory"""
+    recordings = {}
+    for filename in sorted(os.listdir(directory)):
+        if not filename.endswith('.html'):
+            continue
+        name = filename[:-len('.html')]
+        meta_path = os.path.join(directory, name + '.json')
+        meta = {}
+        if os.path.exists(meta_path):
+            with open(meta_path) as f:
+                meta = json.load(f)
+        recordings[name] = (os.path.join(directory, filename), meta)
+    return recordings
+
+
+class ReplayServer:
+    """Stand-in HTTP lokal untuk sumber, menyajikan rekaman di /<nama> (atau / bila hanya satu)
+
+    latency: detik sebelum respons dikirim; bandwidth: batas bytes/detik body (None = tanpa batas);
+    failure_rate: peluang respons failure_status, dan fail_first: jumlah request pertama yang
+    selalu gagal. Pilihan gagal/tidak memakai Random(seed) sehingga urutannya reproducible.
+    If-None-Match / If-Modified-Since yang cocok dijawab 304 seperti sumber asli.
+    """
+
+    def __init__(self, directory, host='127.0.0.1', port=0, latency=0.0, bandwidth=None,
+                 failure_rate=0.0, failure_status=503, fail_first=0, seed=0):
+        self.recordings = load_recordings(directory)
+        if not self.recordings:
+            raise ValueError(f"Tidak ada rekaman .html di {directory}")
+        self.latency = latency
+        self.bandwidth = bandwidth
+        self.failure_rate = failure_rate
+        self.failure_status = failure_status
+        self.fail_first = fail_first
+        self.requests = 0
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self._thread = None
+        self.httpd = ThreadingHTTPServer((host, port), self._handler())
+
+    @property
+    def base_url(self):
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}/"
+
+    def url(self, name=None):
+        """URL lokal untuk rekaman name (default: satu-satunya rekaman, di /)"""
+        return self.base_url + (name or '')
+
+    def should_fail(self):
+        with self._lock:
+            self.requests += 1
+            if self.requests <= self.fail_first:
+                return True
+            return self._random.random() < self.failure_rate
+
+    def lookup(self, path):
+        name = path.split('?', 1)[0].strip('/')
+        if not name and len(self.recordings) == 1:
+            name = next(iter(self.recordings))
+        return self.recordings.get(name)
+
+    def _handler(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+
+            def do_GET(self):
+                if server.latency:
+                    time.sleep(server.latency)
+                if server.should_fail():
+                    return self.send_empty(server.failure_status)
+                recording = server.lookup(self.path)
+                if recording is None:
+                    return self.send_empty(404)
+
+                path, meta = recording
+                headers = dict(meta.get('headers', {}))
+                headers.setdefault('Content-Type', 'text/html; charset=utf-8')
+                etag = headers.get('ETag')
+                last_modified = headers.get('Last-Modified')
+                if ((etag and self.headers.get('If-None-Match') == etag) or
+                        (last_modified and self.headers.get('If-Modified-Since') == last_modified)):
+                    return self.send_empty(304, headers)
+
+                self.send_response(200)
+                for key, value in headers.items():
+                    self.send_header(key, value)
+                self.send_header('Content-Length', str(os.path.getsize(path)))
+                self.end_headers()
+                with open(path, 'rb') as f:
+                    server.send_body(f, self.wfile)
+
+            def send_empty(self, status, headers=None):
+                self.send_response(status)
+                for key, value in (headers or {}).items():
+                    if key != 'Content-Type':
+                        self.send_header(key, value)
+                self.send_header('Content-Length', '0')
+                self.end_headers()
+
+            def log_message(self, format, *args):
+                pass
+
+        return Handler
+
+    def send_body(self, source, target):
+        """Kirim body per chunk; dengan bandwidth, setiap chunk diberi jeda sesuai ukurannya"""
+        chunk_size = CHUNK_SIZE if not self.bandwidth else max(1, min(CHUNK_SIZE, int(self.bandwidth / 10)))
+        started = time.monotonic()
+        sent = 0
+        try:
+            while True:
+                chunk = source.read(chunk_size)
+                if not chunk:
+                    break
+                target.write(chunk)
+                sent += len(chunk)
+                if self.bandwidth:
+                    delay = started + sent / self.bandwidth - time.monotonic()
+                    if delay > 0:
+                        time.sleep(delay)
+        except (BrokenPipeError, ConnectionResetError):
+            pass
+
+    def start(self):
+        self._thread = threading.Thread(target=self.httpd.serve_forever, name="bbfs-replay", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+
+def record(url, directory):
+    """Jalankan fetch_complete_data untuk url sambil merekam respons sumber ke directory"""
+    from http_client import get_http_client
+    from optimized_bbfs_system import OptimizedBBFSSystem
+
+    client = get_http_client()
+    previous = client.recorder
+    client.recorder = Recorder(directory)
+    try:
+        return OptimizedBBFSSystem(url).fetch_complete_data()
+    finally:
+        client.recorder = previous
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    record_parser = commands.add_parser('record', help="Rekam respons sumber lewat fetch_complete_data")
+    record_parser.add_argument('url')
+    record_parser.add_argument('--out', default='recordings')
+
+    serve_parser = commands.add_parser('serve', help="Sajikan rekaman dari server lokal")
+    serve_parser.add_argument('directory')
+    serve_parser.add_argument('--host', default='127.0.0.1')
+    serve_parser.add_argument('--port', type=int, default=8765)
+    serve_parser.add_argument('--latency', type=float, default=0.0, help="Detik sebelum setiap respons")
+    serve_parser.add_argument('--bandwidth', type=int, default=None, help="Batas bytes/detik body")
+    serve_parser.add_argument('--failure-rate', type=float, default=0.0)
+    serve_parser.add_argument('--failure-status', type=int, default=503)
+    serve_parser.add_argument('--fail-first', type=int, default=0, help="Jumlah request pertama yang gagal")
+    serve_parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    if args.command == 'record':
+        raise SystemExit(0 if record(args.url, args.out) else 1)
+
+    server = ReplayServer(
+        args.directory, args.host, args.port, args.latency, args.bandwidth,
+        args.failure_rate, args.failure_status, args.fail_first, args.seed
+    )
+    for name in server.recordings:
+        print(f"{server.url(name)}  ({name})")
+    try:
+        server.httpd.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.httpd.server_close()
+
+
+if __name__ == "__main__":
+    main()
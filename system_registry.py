@@ -0,0 +1,68 @@
+import os
+import threading
+from collections import OrderedDict
+
+DEFAULT_MAX_SYSTEMS = int(os.getenv('BBFS_MAX_MARKETS', '4'))
+DEFAULT_MEMORY_BUDGET = int(os.getenv('BBFS_MEMORY_BUDGET_MB', '256')) * 1024 * 1024
+
+
+class SystemRegistry:
+    """Registry sistem per URL sumber dengan batas LRU dan budget memori
+
+    Beberapa market tetap hangat sekaligus. Bila jumlah sistem atau total memorinya melewati
+    batas, sistem yang paling lama tidak dipakai dikeluarkan dan ditutup (scheduler berhenti).
+    Sistem yang baru diminta tidak pernah dikeluarkan.
+    """
+
+    def __init__(self, factory, max_systems=DEFAULT_MAX_SYSTEMS, memory_budget=DEFAULT_MEMORY_BUDGET):
+        self.factory = factory
+        self.max_systems = max_systems
+        self.memory_budget = memory_budget
+        self._systems = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, url, factory=None):
+        """Sistem untuk url; dibuat lewat factory (default: factory registry) bila belum ada
+
+        Factory (load snapshot, start scheduler) berjalan di luar lock agar URL lain tidak ikut
+        menunggu. Bila dua thread membangun URL yang sama, yang pertama masuk dipakai dan yang
+        kalah ditutup.
+        """
+        with self._lock:
+            system = self._systems.get(url)
+            if system is not None:
+                self._systems.move_to_end(url)
+                # Memori sistem lain bisa bertambah setelah refresh, jadi batas dicek setiap akses
+                self._evict()
+                return system
+
+        created = (factory or self.factory)(url)
+        with self._lock:
+            system = self._systems.setdefault(url, created)
+            self._systems.move_to_end(url)
+            self._evict()
+        if system is not created:
+            created.close()
+        return system
+
+    def memory_usage(self):
+        return sum(system.nbytes for system in self._systems.values())
+
+    def _evict(self):
+        while len(self._systems) > 1 and (
+            len(self._systems) > self.max_systems or self.memory_usage() > self.memory_budget
+        ):
+            url, system = self._systems.popitem(last=False)
+            print(f"Registry: melepas sistem {url} ({system.nbytes / 1e6:.1f} MB)")
+            system.close()
+
+    def urls(self):
+        """URL yang sedang hangat, dari yang paling lama ke paling baru dipakai"""
+        with self._lock:
+            return list(self._systems)
+
+    def __contains__(self, url):
+        return url in self._systems
+
+    def __len__(self):
+        return len(self._systems)
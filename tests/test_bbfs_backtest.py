@@ -0,0 +1,115 @@
+"""Backtest vectorized dan jalur inkremental harus sama dengan versi per-langkah"""
+import numpy as np
+import pytest
+
+from bbfs_backtest import BacktestCheckpoint, WalkForwardBacktest, backtest_history, sequential_backtest
+from bbfs_model import DEFAULT_PARAMS, BBFSParams, PatternModel
+from draw_history import DrawHistory
+from optimized_bbfs_system import OptimizedBBFSSystem
+
+PARAMS = [
+    DEFAULT_PARAMS,
+    BBFSParams(loss_threshold=0),
+    BBFSParams(loss_threshold=1, shift_score=500),
+    BBFSParams(day_top=2, input_top=1, global_top=0, loss_threshold=7),
+    BBFSParams(day_top=10, input_top=10, global_top=10, input_score=0, presence_weight=0, loss_threshold=10),
+    BBFSParams(day_top=0, input_top=0, global_top=3, input_score=50, presence_weight=100, shift_score=0),
+]
+
+
+def make_history(day_codes, results):
+    ordinals = 738000 + np.arange(len(results))
+    return DrawHistory.from_arrays(ordinals, day_codes, results)
+
+
+def random_history(seed, n):
+    rng = np.random.default_rng(seed)
+    return make_history(rng.integers(0, 7, n), rng.integers(0, 10000, n))
+
+
+def tie_history(seed, n):
+    """Sedikit 2D berbeda: loss streak panjang dan banyak skor seri"""
+    rng = np.random.default_rng(seed)
+    return make_history(rng.integers(0, 3, n), rng.choice([1111, 1212, 2121, 3300, 4433, 5500, 9999, 7], n))
+
+
+HISTORIES = {
+    'random-500': random_history(11, 500),
+    'random-3000': random_history(12, 3000),
+    'ties-800': tie_history(13, 800),
+    'two-draws': random_history(14, 2),
+}
+
+
+@pytest.mark.parametrize('params', PARAMS)
+@pytest.mark.parametrize('name', sorted(HISTORIES))
+def test_bitmask_backtest_matches_sequential(name, params):
+    history = HISTORIES[name]
+    model = PatternModel.from_history(history, params)
+    result = backtest_history(model, history)
+    assert np.array_equal(result.win, sequential_backtest(model, history))
+
+
+def naive_walk_forward(history, params):
+    """Referensi: model dibangun ulang dari draw 0..i untuk setiap langkah i"""
+    wins = []
+    consecutive_losses = 0
+    for i in range(len(history) - 1):
+        model = PatternModel.from_history(history[:i + 1], params)
+        bbfs = set(model.generate_digits(int(history.last_2d[i]), int(history.day_codes[i]), consecutive_losses))
+        next_2d = int(history.last_2d[i + 1])
+        is_win = {next_2d // 10, next_2d % 10} <= bbfs
+        wins.append(is_win)
+        consecutive_losses = 0 if is_win else consecutive_losses + 1
+    return wins
+
+
+def checkpoint_from_wins(wins):
+    checkpoint = BacktestCheckpoint()
+    for is_win in wins:
+        checkpoint.record(is_win)
+    return checkpoint
+
+
+@pytest.mark.parametrize('params', PARAMS[:4])
+@pytest.mark.parametrize('name', ['random-500', 'ties-800', 'two-draws'])
+def test_walk_forward_matches_naive_rebuild(name, params):
+    history = HISTORIES[name][:300]
+    walk_forward = WalkForwardBacktest(params)
+    walk_forward.extend(history)
+    assert walk_forward.summary() == checkpoint_from_wins(naive_walk_forward(history, params)).summary()
+
+
+@pytest.mark.parametrize('name', ['random-3000', 'ties-800'])
+def test_checkpoint_from_result_matches_recorded_steps(name):
+    history = HISTORIES[name]
+    result = backtest_history(PatternModel.from_history(history), history)
+    checkpoint = BacktestCheckpoint.from_result(result)
+    recorded = checkpoint_from_wins(result.win.tolist())
+    assert checkpoint.summary() == recorded.summary()
+    assert checkpoint.consecutive_losses == recorded.consecutive_losses
+    assert checkpoint.streak_counts == recorded.streak_counts
+
+
+@pytest.mark.parametrize('name', ['random-3000', 'ties-800'])
+def test_resumed_checkpoints_match_full_rerun(name):
+    history = HISTORIES[name]
+    full = OptimizedBBFSSystem("http://test.invalid/")
+    full.replace_data(history)
+
+    resumed = OptimizedBBFSSystem("http://test.invalid/")
+    resumed.replace_data(history[:len(history) // 2])
+    first_walk_forward = resumed.snapshot().walk_forward
+    # Dua append: satu draw, lalu sisa history
+    resumed.append_draws(history[len(history) // 2:len(history) // 2 + 1])
+    resumed.append_draws(history[len(history) // 2 + 1:])
+
+    expected = dict(full.performance_data)
+    actual = dict(resumed.performance_data)
+    expected.pop('last_updated')
+    actual.pop('last_updated')
+    assert actual == expected
+    assert resumed.snapshot().walk_forward.summary() == full.snapshot().walk_forward.summary()
+    assert resumed.snapshot().walk_forward.model.transitions == len(history) - 1
+    # Checkpoint versi lama tidak ikut berubah (copy-on-write)
+    assert first_walk_forward.checkpoint.total_tests == len(history) // 2 - 1
@@ -0,0 +1,35 @@
+"""Parse per chunk harus identik dengan parse satu chunk, di mana pun batas chunk jatuh"""
+import numpy as np
+import pytest
+
+from benchmarks.synthetic import synthetic_page
+from result_parser import StreamingResultParser, parse_content
+
+# Halaman dengan format cell sumber, ditambah baris tepi: format tanggal saja, nama hari
+# Indonesia/singkat/tak dikenal, tahun di luar window, urutan mundur dan markup mirip cell
+EXTRA_ROWS = (
+    b'<tr><td title="Friday=2025-06-20">1234</td><td title="senin=2025-06-23=0007">0007</td></tr>\n'
+    b'<tr><td title="Sat=2025-06-21=9999">9999</td><td title="Holiday=2025-06-24=4321">4321</td></tr>\n'
+    b'<tr><td title="Monday=2019-12-30=5555">5555</td><td title="Monday=2025-13-01=1111">1111</td></tr>\n'
+    b'<tr><td>2468</td><td title="broken">1357</td><td title="Tuesday=2025-06-24=12">12</td></tr>\n'
+)
+PAGE = b''.join(synthetic_page(400, seed=7)).replace(b'</table>', EXTRA_ROWS + b'</table>')
+
+
+def feed_chunks(content, chunk_size, **kwargs):
+    parser = StreamingResultParser(**kwargs)
+    for begin in range(0, len(content), chunk_size):
+        parser.feed(content[begin:begin + chunk_size])
+    return parser, parser.close()
+
+
+@pytest.mark.parametrize('default_day', [0, None])
+@pytest.mark.parametrize('chunk_size', [1, 3, 7])
+def test_chunked_parse_matches_single_chunk(chunk_size, default_day):
+    expected = parse_content(PAGE, default_day=default_day)
+    parser, history = feed_chunks(PAGE, chunk_size, default_day=default_day)
+
+    assert len(expected) > 400
+    assert parser.cells_seen == feed_chunks(PAGE, len(PAGE), default_day=default_day)[0].cells_seen
+    for column in ('ordinals', 'day_codes', 'results'):
+        assert np.array_equal(getattr(history, column), getattr(expected, column)), column
@@ -1,75 +1,169 @@
-import requests
-import re
 from datetime import datetime
 import random
 import json
 from collections import defaultdict, Counter
+from concurrent.futures import ProcessPoolExecutor
+import contextlib
+import functools
+import hashlib
+import io
 import itertools
+import os
 import time
 import math
+import threading
+from draw_history import ULTRA_DAY_NAMES, DrawHistory
+from history_snapshot import get_snapshot_store
+from http_client import get_http_client
+from result_parser import parse_response
+
+STRATEGY_TYPES = ["ultra", "defensive", "aggressive", "balanced"]
+# Key snapshot lokal terpisah dari OptimizedBBFSSystem untuk URL yang sama: layout record berbeda
+# (hari tak dikenal dilewati) dan validator HTTP serta penulisan ekor milik sistem itu tetap utuh
+SNAPSHOT_KEY_PREFIX = "ultra:"
+TWO_D = [f"{value:02d}" for value in range(100)]
+DIGIT_BITS = {str(digit): 1 << digit for digit in range(10)}
+
+
+def evaluate_strategy(system, seed, iteration, strategy_type, horizon=None, detail=False):
+    """Satu evaluasi kandidat dengan seed deterministik per task, mengembalikan (performance, log, deterministic)
+
+    Hasilnya hanya bergantung pada (seed, iteration, strategy_type), tidak pada urutan atau
+    process yang menjalankannya; state random pemanggil dipulihkan setelahnya. deterministic
+    berarti evaluasi tidak memakai satu pun bilangan acak, jadi seed lain pasti memberi hasil sama.
+    Tanpa detail hanya statistik yang dihitung; detail=True mengulang task yang sama lengkap dengan
+    hasil per test (untuk pemenang). horizon membatasi jumlah test (prefix) untuk successive halving.
+    """
+    state = random.getstate()
+    random.seed(f"{seed}:{iteration}:{strategy_type}")
+    seeded = random.getstate()
+    log = io.StringIO()
+    try:
+        with contextlib.redirect_stdout(log):
+            performance = system.test_strategy_rigorously(
+                system.strategy(strategy_type),
+                f"{strategy_type.capitalize()}_Strategy_Iter{iteration}",
+                max_tests=horizon,
+                detail=detail
+            )
+        deterministic = random.getstate() == seeded
+    finally:
+        random.setstate(state)
+    return performance, log.getvalue(), deterministic
+
+
+# Sistem read-only per worker process (diwariskan saat fork, dikirim sekali per worker saat spawn)
+_worker_system = None
+
+def _init_search_worker(system):
+    global _worker_system
+    _worker_system = system
+
+def _search_task(task):
+    return evaluate_strategy(_worker_system, *task)
+
 
 class UltraSmartBBFS:
-    def __init__(self):
+    def __init__(self, snapshot_store=None):
         self.url = "http://178.128.121.191/"
-        self.data = []
+        self.snapshot_store = snapshot_store
+        self.data = DrawHistory(ULTRA_DAY_NAMES)
         self.transition_matrix = {}
         self.day_patterns = {}
         self.digit_frequency = {}
         self.winning_sequences = []
         self.loss_patterns = {}
         self.best_strategy = None
+        # Hasil strategi deterministik per fingerprint (strategi + data), dipakai ulang antar iterasi
+        self.strategy_memo = {}
+        self._test_inputs = None
+        
+    @property
+    def snapshot_key(self):
+        return SNAPSHOT_KEY_PREFIX + self.url
+    
+    def load_snapshot(self):
+        """Warm start dari snapshot lokal tanpa menyentuh network"""
+        if self.snapshot_store is None:
+            return False
+        
+        snapshot = self.snapshot_store.load(self.snapshot_key)
+        if not snapshot:
+            return False
         
-    def load_and_process_data(self):
+        rows, _ = snapshot
+        ordinals, day_codes, results = [], [], []
+        for date_str, day_name, result in rows:
+            day_std = self.standardize_day(day_name)
+            if day_std:
+                ordinals.append(datetime.strptime(date_str, '%Y-%m-%d').toordinal())
+                day_codes.append(ULTRA_DAY_NAMES.index(day_std))
+                results.append(int(result))
+        
+        self.data = DrawHistory.from_arrays(ordinals, day_codes, results, ULTRA_DAY_NAMES)
+        print(f"Loaded {len(self.data)} records from local snapshot")
+        return len(self.data) >= 1200
+    
+    def load_and_process_data(self, use_snapshot=True, revalidate=True):
         """Load data dengan preprocessing yang lebih canggih"""
+        if use_snapshot:
+            try:
+                if self.load_snapshot():
+                    # Stale-while-revalidate: analisis memakai snapshot, sumber dicek di background
+                    if revalidate:
+                        self.revalidate_in_background()
+                    return True
+            except Exception as e:
+                print(f"Error loading snapshot: {e}")
+        
         print("Mengunduh dan memproses data dengan analisis mendalam...")
         
         try:
-            response = requests.get(self.url, timeout=30)
-            content = response.text
-            
-            pattern = r'<td title="([^"]*=\d{4}-\d{2}-\d{2}=[^"]*)">(\d{4})</td>'
-            matches = re.findall(pattern, content)
-            
-            raw_data = []
-            for match in matches:
-                title_info = match[0]
-                result = match[1]
-                
-                parts = title_info.split('=')
-                if len(parts) >= 2:
-                    day_name = parts[0].strip()
-                    date_str = parts[1].strip()
-                    
-                    try:
-                        date_obj = datetime.strptime(date_str, '%Y-%m-%d')
-                        if 2020 <= date_obj.year <= 2025:
-                            day_std = self.standardize_day(day_name)
-                            if day_std:
-                                raw_data.append({
-                                    'date': date_obj,
-                                    'day': day_std,
-                                    'result': result,
-                                    'last_2d': result[-2:],
-                                    'digits': [int(d) for d in result],
-                                    'digit_sum': sum(int(d) for d in result),
-                                    'digit_product': math.prod(int(d) for d in result if int(d) > 0),
-                                    'even_count': sum(1 for d in result if int(d) % 2 == 0),
-                                    'odd_count': sum(1 for d in result if int(d) % 2 == 1)
-                                })
-                    except ValueError:
-                        continue
-            
-            # Sort by date
-            raw_data.sort(key=lambda x: x['date'])
-            self.data = raw_data
-            
-            print(f"Loaded {len(self.data)} records from 2020-2025")
+            self.data = self.download_history()
+            print(f"Loaded {len(self.data)} records ({self.data!r})")
             return len(self.data) >= 1200
             
         except Exception as e:
             print(f"Error loading data: {e}")
+            # Sumber lambat atau mati: snapshot terakhir yang baik lebih berguna daripada gagal
+            if not use_snapshot and self.snapshot_store is not None:
+                print("Memakai snapshot lokal terakhir")
+                return self.load_snapshot()
             return False
     
+    def download_history(self):
+        """Download dan parse halaman sumber, lalu simpan sebagai snapshot lokal"""
+        response = get_http_client().get(self.url, timeout=30)
+        
+        # Streaming single-pass parse; hari yang tidak dikenal dilewati
+        raw_data = DrawHistory(ULTRA_DAY_NAMES)
+        parse_response(response, history=raw_data, default_day=None)
+        if self.snapshot_store is not None and raw_data:
+            self.snapshot_store.save(self.snapshot_key, raw_data)
+        return raw_data
+    
+    def revalidate_in_background(self):
+        """Perbarui snapshot lokal dari sumber tanpa menahan analisis yang sedang berjalan"""
+        def revalidate():
+            try:
+                fresh = self.download_history()
+                print(f"Snapshot lokal diperbarui: {len(fresh)} records")
+            except Exception as e:
+                print(f"Revalidasi snapshot gagal: {e}")
+        
+        thread = threading.Thread(target=revalidate, name="ultra-revalidate", daemon=True)
+        thread.start()
+        return thread
+    
+    def __getstate__(self):
+        # Untuk worker process: store (lock SQLite) dan callable strategi tidak ikut dikirim
+        state = self.__dict__.copy()
+        state['snapshot_store'] = None
+        state['best_strategy'] = None
+        state['strategy_memo'] = {}
+        state['_test_inputs'] = None
+        return state
+    
     def standardize_day(self, day_name):
         """Standardize day names"""
         day_map = {
@@ -246,7 +340,8 @@ class UltraSmartBBFS:
                 complement = str((10 - int(digit)) % 10)
                 candidates.add(complement)
         
-        return list(candidates)
+        # Urutan tetap (bukan urutan hash set) agar hasil dengan seed yang sama identik di semua process
+        return sorted(candidates)
     
     def ultra_strategy(self, input_2d, candidates, context_score):
         """Strategi ultra dengan optimization maksimal"""
@@ -300,7 +395,7 @@ class UltraSmartBBFS:
             freq_candidates = [d[0] for d in freq_items[:3]]
         
         # Always include input digits
-        bbfs = list(set(input_2d + freq_candidates))
+        bbfs = sorted(set(list(input_2d) + freq_candidates))
         
         # Fill remaining
         remaining_candidates = [c for c in candidates if c not in bbfs]
@@ -400,57 +495,81 @@ class UltraSmartBBFS:
         
         return bbfs[:5]
     
-    def test_strategy_rigorously(self, strategy_func, strategy_name, max_allowed_losses=5):
-        """Test strategi dengan kriteria ketat"""
+    def test_inputs(self):
+        """(input 2D, hari, bitmask digit 2D berikutnya) per test, dibuat sekali per data"""
+        data = self.data
+        cached = self._test_inputs
+        if cached is None or cached[0] is not data or cached[1] != len(data):
+            total_tests = min(1200, len(data) - 1)
+            last_2d = data.last_2d[:total_tests + 1].astype(int)
+            next_masks = (1 << (last_2d[1:] // 10)) | (1 << (last_2d[1:] % 10))
+            cached = self._test_inputs = (data, len(data), (
+                [TWO_D[value] for value in last_2d[:total_tests].tolist()],
+                [data.day_names[code] for code in data.day_codes[:total_tests].tolist()],
+                next_masks.tolist()
+            ))
+        return cached[2]
+    
+    def test_strategy_rigorously(self, strategy_func, strategy_name, max_allowed_losses=5, max_tests=None,
+                                 detail=True):
+        """Test strategi dengan kriteria ketat
+        
+        detail=False hanya menghitung statistik (menang, streak kalah) tanpa list hasil per test;
+        dipakai saat mengevaluasi banyak kandidat, detail dibuat ulang hanya untuk pemenangnya.
+        max_tests membatasi test ke prefix history (horizon pendek pada successive halving).
+        """
         print(f"Testing {strategy_name} dengan kriteria maksimal {max_allowed_losses} kalah beruntun...")
         
-        results = []
+        inputs, days, next_masks = self.test_inputs()
+        results = [] if detail else None
         consecutive_losses = 0
         max_consecutive = 0
         total_wins = 0
-        total_tests = min(1200, len(self.data) - 1)
+        tested = 0
+        total_tests = len(inputs) if max_tests is None else min(len(inputs), max_tests)
         
         for i in range(total_tests):
-            current = self.data[i]
-            next_item = self.data[i + 1]
-            
             # Generate BBFS
-            bbfs = strategy_func(current['last_2d'], current['day'])
+            bbfs = strategy_func(inputs[i], days[i])
             
-            # Test win condition
-            bbfs_set = set(bbfs)
-            next_2d_set = set(next_item['last_2d'])
-            is_win = next_2d_set.issubset(bbfs_set)
+            # Test win condition: kedua digit 2D berikutnya ada di BBFS
+            bbfs_mask = 0
+            for digit in bbfs:
+                bbfs_mask |= DIGIT_BITS[digit]
+            is_win = not next_masks[i] & ~bbfs_mask
+            tested += 1
             
             if is_win:
                 consecutive_losses = 0
                 total_wins += 1
             else:
                 consecutive_losses += 1
-                max_consecutive = max(max_consecutive, consecutive_losses)
+                if consecutive_losses > max_consecutive:
+                    max_consecutive = consecutive_losses
             
-            results.append({
-                'test_no': i + 1,
-                'date': current['date'].strftime('%Y-%m-%d'),
-                'day': current['day'],
-                'input_2d': current['last_2d'],
-                'bbfs': bbfs,
-                'next_2d': next_item['last_2d'],
-                'win': is_win,
-                'consecutive_losses': consecutive_losses
-            })
+            if detail:
+                results.append({
+                    'test_no': i + 1,
+                    'date': datetime.fromordinal(int(self.data.ordinals[i])).strftime('%Y-%m-%d'),
+                    'day': days[i],
+                    'input_2d': inputs[i],
+                    'bbfs': bbfs,
+                    'next_2d': TWO_D[self.data.last_2d[i + 1]],
+                    'win': is_win,
+                    'consecutive_losses': consecutive_losses
+                })
             
             # Early termination if criteria not met
             if max_consecutive > max_allowed_losses and i > 200:
                 print(f"  Early termination: Max consecutive losses {max_consecutive} > {max_allowed_losses}")
                 break
         
-        win_rate = (total_wins / len(results) * 100) if results else 0
+        win_rate = (total_wins / tested * 100) if tested else 0
         meets_criteria = max_consecutive <= max_allowed_losses
         
         performance = {
             'strategy_name': strategy_name,
-            'total_tests': len(results),
+            'total_tests': tested,
             'wins': total_wins,
             'win_rate': round(win_rate, 2),
             'max_consecutive_losses': max_consecutive,
@@ -458,7 +577,7 @@ class UltraSmartBBFS:
             'results': results
         }
         
-        print(f"  Total tests: {len(results)}")
+        print(f"  Total tests: {tested}")
         print(f"  Wins: {total_wins}")
         print(f"  Win rate: {win_rate:.2f}%")
         print(f"  Max consecutive losses: {max_consecutive}")
@@ -466,52 +585,154 @@ class UltraSmartBBFS:
         
         return performance
     
-    def intensive_search(self, max_iterations=100):
-        """Pencarian intensif strategi optimal"""
+    def strategy(self, strategy_type):
+        """Fungsi strategi (input_2d, day) -> BBFS untuk strategy_type"""
+        return functools.partial(self.generate_smart_bbfs, strategy_type=strategy_type)
+    
+    def analysis_digest(self):
+        """Digest data yang dianalisis; hasil memo hanya berlaku untuk data yang sama"""
+        digest = hashlib.sha1()
+        for column in (self.data.ordinals, self.data.day_codes, self.data.results):
+            digest.update(column.tobytes())
+        return digest.hexdigest()
+    
+    def strategy_fingerprint(self, strategy_type, digest=None, horizon=None):
+        """Fingerprint konfigurasi strategi: tipe, kriteria test (jumlah test) dan data"""
+        total_tests = min(1200, len(self.data) - 1)
+        if horizon is not None:
+            total_tests = min(total_tests, horizon)
+        return strategy_type, total_tests, digest or self.analysis_digest()
+    
+    def strategy_detail(self, task):
+        """Performance lengkap dengan hasil per test untuk satu task (seed, iterasi, strategi)"""
+        performance, _, _ = evaluate_strategy(self, *task, detail=True)
+        return performance
+    
+    def memoized_search(self, tasks, processes=None):
+        """Seperti run_search_tasks, tetapi strategi deterministik yang sudah dievaluasi tidak diulang
+        
+        Menghasilkan (task, performance, log) sesuai urutan task. Task yang fingerprint-nya ada di
+        strategy_memo memakai hasil tersimpan; hasil baru yang deterministik disimpan ke memo.
+        """
+        digest = self.analysis_digest()
+        fresh = [task for task in tasks if self.strategy_fingerprint(task[2], digest, *task[3:]) not in self.strategy_memo]
+        fresh_tasks = set(fresh)
+        results = self.run_search_tasks(fresh, processes)
+        try:
+            for task in tasks:
+                fingerprint = self.strategy_fingerprint(task[2], digest, *task[3:])
+                if task not in fresh_tasks:
+                    performance = self.strategy_memo[fingerprint]
+                    yield task, performance, f"{performance['strategy_name']}: hasil deterministik dipakai ulang\n"
+                    continue
+                _, (performance, log, deterministic) = next(results)
+                if deterministic:
+                    self.strategy_memo[fingerprint] = performance
+                yield task, performance, log
+        finally:
+            results.close()
+    
+    def run_search_tasks(self, tasks, processes=None):
+        """Evaluasi task (seed, iteration, strategy_type) dan hasilkan (task, hasil) sesuai urutan task
+        
+        Dengan lebih dari satu process, task dibagi ke process pool dan dijalankan mendahului
+        urutan konsumsi secukupnya; bila pemanggil berhenti (early stopping), sisa task dibatalkan.
+        """
+        processes = processes or os.cpu_count() or 1
+        if processes == 1 or len(tasks) <= 1:
+            for task in tasks:
+                yield task, evaluate_strategy(self, *task)
+            return
+        
+        executor = ProcessPoolExecutor(
+            max_workers=min(processes, len(tasks)),
+            initializer=_init_search_worker,
+            initargs=(self,)
+        )
+        try:
+            lookahead = processes * 2
+            pending = iter(tasks)
+            futures = [(task, executor.submit(_search_task, task)) for task in itertools.islice(pending, lookahead)]
+            while futures:
+                task, future = futures.pop(0)
+                result = future.result()
+                for next_task in itertools.islice(pending, 1):
+                    futures.append((next_task, executor.submit(_search_task, next_task)))
+                yield task, result
+        finally:
+            executor.shutdown(wait=True, cancel_futures=True)
+    
+    def intensive_search(self, max_iterations=100, processes=None, seed=0):
+        """Pencarian intensif strategi optimal
+        
+        Setiap (iterasi, strategi) dievaluasi di process pool dengan seed tetap per task, lalu
+        digabung sesuai urutan iterasi: hasil dan early stopping sama dengan pencarian sekuensial.
+        Strategi yang di iterasi pertama terbukti deterministik (tidak memakai random) hanya
+        dievaluasi sekali; iterasi berikutnya hanya menjalankan konfigurasi yang memang berbeda.
+        Kandidat dievaluasi tanpa detail; hasil per test hanya dibuat untuk strategi terbaik.
+        """
         print(f"Memulai pencarian intensif dengan {max_iterations} iterasi...")
         print("Target: Maksimal 5 kalah beruntun dengan 1200+ test")
         
         best_performance = None
+        best_task = None
         strategies_tested = 0
         
-        strategy_types = ["ultra", "defensive", "aggressive", "balanced"]
-        
-        for iteration in range(1, max_iterations + 1):
-            print(f"\n--- Iterasi {iteration} ---")
+        strategy_types = STRATEGY_TYPES
+        digest = self.analysis_digest()
+        
+        def search():
+            yield from self.memoized_search([(seed, 1, strategy_type) for strategy_type in strategy_types], processes)
+            # Determinisme sudah diketahui setelah iterasi pertama
+            varying = [strategy_type for strategy_type in strategy_types
+                       if self.strategy_fingerprint(strategy_type, digest) not in self.strategy_memo]
+            skipped = (max_iterations - 1) * (len(strategy_types) - len(varying))
+            if skipped > 0:
+                print(f"\n{skipped} evaluasi ulang strategi deterministik dilewati")
+            yield from self.memoized_search(
+                [(seed, iteration, strategy_type)
+                 for iteration in range(2, max_iterations + 1) for strategy_type in varying],
+                processes
+            )
+        
+        current_iteration = None
+        for task, performance, log in search():
+            _, iteration, strategy_type = task
+            if iteration != current_iteration:
+                # Progress report
+                if current_iteration is not None and current_iteration % 10 == 0:
+                    current_best = best_performance['max_consecutive_losses'] if best_performance else "N/A"
+                    print(f"Progress: {strategies_tested} strategies tested, best max losses: {current_best}")
+                current_iteration = iteration
+                print(f"\n--- Iterasi {iteration} ---")
+            print(log, end='')
+            strategies_tested += 1
             
-            for strategy_type in strategy_types:
-                strategies_tested += 1
-                
-                def current_strategy(input_2d, day):
-                    return self.generate_smart_bbfs(input_2d, day, strategy_type)
+            # Update best if better
+            if (best_performance is None or 
+                performance['max_consecutive_losses'] < best_performance['max_consecutive_losses'] or
+                (performance['max_consecutive_losses'] == best_performance['max_consecutive_losses'] and
+                 performance['win_rate'] > best_performance['win_rate'])):
                 
-                performance = self.test_strategy_rigorously(
-                    current_strategy, 
-                    f"{strategy_type.capitalize()}_Strategy_Iter{iteration}"
-                )
-                
-                # Update best if better
-                if (best_performance is None or 
-                    performance['max_consecutive_losses'] < best_performance['max_consecutive_losses'] or
-                    (performance['max_consecutive_losses'] == best_performance['max_consecutive_losses'] and
-                     performance['win_rate'] > best_performance['win_rate'])):
-                    
-                    best_performance = performance
-                    self.best_strategy = current_strategy
-                
-                # Success condition
-                if performance['meets_criteria']:
-                    print(f"\n🎉 STRATEGI OPTIMAL DITEMUKAN!")
-                    print(f"Strategi: {performance['strategy_name']}")
-                    print(f"Max consecutive losses: {performance['max_consecutive_losses']}")
-                    print(f"Win rate: {performance['win_rate']}%")
-                    print(f"Total strategies tested: {strategies_tested}")
-                    return best_performance
+                best_performance = performance
+                best_task = task
+                self.best_strategy = self.strategy(strategy_type)
             
-            # Progress report
-            if iteration % 10 == 0:
-                current_best = best_performance['max_consecutive_losses'] if best_performance else "N/A"
-                print(f"Progress: {strategies_tested} strategies tested, best max losses: {current_best}")
+            # Success condition
+            if performance['meets_criteria']:
+                print(f"\n🎉 STRATEGI OPTIMAL DITEMUKAN!")
+                print(f"Strategi: {performance['strategy_name']}")
+                print(f"Max consecutive losses: {performance['max_consecutive_losses']}")
+                print(f"Win rate: {performance['win_rate']}%")
+                print(f"Total strategies tested: {strategies_tested}")
+                return self.strategy_detail(best_task)
+        
+        if current_iteration is not None and current_iteration % 10 == 0:
+            current_best = best_performance['max_consecutive_losses'] if best_performance else "N/A"
+            print(f"Progress: {strategies_tested} strategies tested, best max losses: {current_best}")
+        
+        if best_task is not None:
+            best_performance = self.strategy_detail(best_task)
         
         print(f"\nSelesai pencarian intensif:")
         print(f"Total strategies tested: {strategies_tested}")
@@ -523,6 +744,76 @@ class UltraSmartBBFS:
         
         return best_performance
     
+    def halving_search(self, candidates=400, min_horizon=40, eta=3, processes=None, seed=0):
+        """Successive halving: saring banyak kandidat pada prefix pendek, promosikan yang terbaik
+        
+        Kandidat adalah task (seed, iterasi, strategi) seperti di intensive_search. Setiap rung
+        mengevaluasi semua kandidat tersisa pada horizon test yang sama, lalu hanya 1/eta teratas
+        (max kalah beruntun, lalu win rate) yang lanjut ke horizon eta kali lebih panjang, sampai
+        horizon penuh 1200 test. Karena seed per task, prefix yang sama memberi BBFS yang sama
+        di setiap rung. Hanya hasil horizon penuh yang dinilai terhadap kriteria.
+        
+        Setiap rung mengevaluasi satu task per strategi lebih dulu; strategi yang ternyata
+        deterministik pada horizon itu memberi hasil sama untuk semua seed, jadi klonnya dibuang
+        sebelum dievaluasi dan tidak ikut mengisi slot promosi.
+        """
+        strategy_types = STRATEGY_TYPES
+        iterations = max(1, math.ceil(candidates / len(strategy_types)))
+        tasks = [(seed, iteration, strategy_type)
+                 for iteration in range(1, iterations + 1) for strategy_type in strategy_types]
+        full_horizon = min(1200, len(self.data) - 1)
+        full_cost = len(tasks) * full_horizon
+        horizon = min(min_horizon, full_horizon)
+        print(f"Successive halving: {len(tasks)} kandidat, horizon {horizon} → {full_horizon} test, eta={eta}")
+        
+        digest = self.analysis_digest()
+        tests_run = 0
+        while True:
+            probes = {}
+            for task in tasks:
+                probes.setdefault(task[2], task)
+            probe_tasks = list(probes.values())
+            results = {}
+            for batch in (probe_tasks, None):
+                if batch is None:
+                    # Klon strategi deterministik (sudah ada di memo untuk horizon ini) dibuang
+                    probed = set(probe_tasks)
+                    batch = [task for task in tasks if task not in probed and
+                             self.strategy_fingerprint(task[2], digest, horizon) not in self.strategy_memo]
+                fresh = {task for task in batch
+                         if self.strategy_fingerprint(task[2], digest, horizon) not in self.strategy_memo}
+                for task, performance, _ in self.memoized_search([task + (horizon,) for task in batch], processes):
+                    results[task[:3]] = performance
+                    if task[:3] in fresh:
+                        tests_run += performance['total_tests']
+            
+            ranked = []
+            for task in tasks:
+                if task in results:
+                    performance = results[task]
+                    ranked.append((performance['max_consecutive_losses'], -performance['win_rate'], len(ranked),
+                                   task, performance))
+            ranked.sort()
+            clones = len(tasks) - len(ranked)
+            print(f"  Rung horizon {horizon}: {len(ranked)} kandidat"
+                  f"{f' ({clones} klon deterministik dibuang)' if clones else ''}, "
+                  f"terbaik {ranked[0][4]['strategy_name']} (max losses {ranked[0][0]}, win rate {-ranked[0][1]}%)")
+            if horizon >= full_horizon:
+                break
+            tasks = [entry[3] for entry in ranked[:max(1, math.ceil(len(ranked) / eta))]]
+            horizon = min(full_horizon, horizon * eta)
+        
+        print(f"Total test dijalankan: {tests_run} (evaluasi penuh semua kandidat: {full_cost})")
+        
+        best_task = ranked[0][3]
+        best_performance = self.strategy_detail(best_task + (full_horizon,))
+        self.best_strategy = self.strategy(best_task[2])
+        if best_performance['meets_criteria']:
+            print(f"\n🎉 STRATEGI OPTIMAL DITEMUKAN: {best_performance['strategy_name']}")
+        else:
+            print(f"⚠️ Belum optimal. Best max losses: {best_performance['max_consecutive_losses']}")
+        return best_performance
+    
     def show_final_results(self, performance, sample_count=25):
         """Tampilkan hasil final dengan detail"""
         if not performance:
@@ -554,7 +845,7 @@ def main():
     print("Kriteria sukses: Maksimal 5 kalah beruntun dengan 1200+ test real")
     
     # Initialize system
-    system = UltraSmartBBFS()
+    system = UltraSmartBBFS(snapshot_store=get_snapshot_store())
     
     if not system.load_and_process_data():
         print("Gagal load data!")